@@ -5,6 +5,7 @@ Demonstrates the LangGraph workflow in action
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -32,14 +33,21 @@ def demo_workflow():
         "I want a refund for my defective product"
     ]
     
-    print(f"\n📝 Testing {len(demo_queries)} queries:\n")
+    print(f"\n📝 Testing {len(demo_queries)} queries concurrently:\n")
     
-    for i, query in enumerate(demo_queries, 1):
+    # Queries are independent, so overlap their RAG/LLM calls. verbose is
+    # off because concurrent runs would interleave their output.
+    with ThreadPoolExecutor(max_workers=len(demo_queries)) as executor:
+        results = list(executor.map(
+            lambda query: workflow.run(query, verbose=False),
+            demo_queries
+        ))
+    
+    for i, (query, result) in enumerate(zip(demo_queries, results), 1):
         print(f"\n{'='*70}")
-        print(f"Query {i}/{len(demo_queries)}")
+        print(f"Query {i}/{len(demo_queries)}: {query}")
         print(f"{'='*70}")
-        
-        result = workflow.run(query, verbose=True)
+        print(result.get('final_response', 'No response generated'))
         
         print(f"\n{'─'*70}")
         print(f"Summary:")
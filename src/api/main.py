@@ -3,12 +3,25 @@ FastAPI REST API for Customer Support Chatbot
 Exposes the LangGraph workflow as a web service
 """
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import hashlib
+import logging
+import logging.handlers
+import orjson
+import queue
+import threading
+import time
+import uuid
 import uvicorn
 import os
 import sys
@@ -18,8 +31,37 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from graph.workflow import get_workflow, ChatbotWorkflow
+from graph.workflow import get_workflow, preload, ChatbotWorkflow
 from graph.state import ChatbotState
+from graph.response_cache import WORKFLOW_CACHE_TTL
+
+# Log records are handed to a queue and written by a background listener
+# thread, so request handlers never block on stdout
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+)
+log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_stream_handler, respect_handler_level=True
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan
+    
+    Runs once per worker process, so every Uvicorn worker builds its own
+    ChatbotWorkflow, executor and background tasks exactly once.
+    """
+    await startup_event()
+    yield
+    await shutdown_event()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,16 +69,20 @@ app = FastAPI(
     description="AI-powered customer support chatbot using RAG and LangGraph",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
+    allow_origins=os.getenv("CORS_ORIGINS", "*").split(","),  # In production, specify actual origins
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists plus max_age let browsers cache the preflight response
+    allow_methods=os.getenv("CORS_ALLOW_METHODS", "GET,POST").split(","),
+    allow_headers=os.getenv("CORS_ALLOW_HEADERS", "Content-Type,Authorization,X-API-Key").split(","),
+    max_age=int(os.getenv("CORS_MAX_AGE", "86400")),
 )
 
 
@@ -111,32 +157,213 @@ class ErrorResponse(BaseModel):
     timestamp: str = Field(..., description="Error timestamp")
 
 
+# Resolve the models' schemas at import time instead of on the first request
+for _model in (ChatRequest, ChatResponse, HealthResponse, ErrorResponse):
+    _model.model_rebuild()
+
+
 # =============================================================================
 # GLOBAL WORKFLOW INSTANCE
 # =============================================================================
 
-# Initialize workflow on startup (singleton)
-chatbot_workflow: Optional[ChatbotWorkflow] = None
+# Initialize workflow on startup (singleton). Handlers read _wf_box[0] only
+# after _ready is set, so the hot path never takes a lock
+_wf_box: List[Optional[ChatbotWorkflow]] = [None]
+_ready = threading.Event()
+
+# Thread pool for running the blocking workflow off the event loop
+WORKFLOW_MAX_WORKERS = int(os.getenv("WORKFLOW_MAX_WORKERS", "8"))
+workflow_executor: Optional[ThreadPoolExecutor] = None
+
+# Exact-match response cache keyed by the normalized query string (LRU).
+# Entries expire with the workflow response cache (WORKFLOW_CACHE_TTL)
+EXACT_CACHE_MAX_SIZE = int(os.getenv("EXACT_CACHE_MAX_SIZE", "1024"))
+EXACT_CACHE_TTL = WORKFLOW_CACHE_TTL
+# normalized query -> (response payload, stored_at)
+_EXACT_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_EXACT_CACHE_LOCK = threading.Lock()
+
+
+def _exact_cache_get(key: str) -> Optional[dict]:
+    """Return the cached response payload for key, marking it recently used"""
+    with _EXACT_CACHE_LOCK:
+        cached = _EXACT_CACHE.get(key)
+        if cached is None:
+            return None
+        payload, stored_at = cached
+        if EXACT_CACHE_TTL > 0 and time.monotonic() - stored_at > EXACT_CACHE_TTL:
+            del _EXACT_CACHE[key]
+            return None
+        _EXACT_CACHE.move_to_end(key)
+        return payload
+
+
+def _exact_cache_put(key: str, payload: dict):
+    """Cache a response payload, evicting the least recently used entry"""
+    if EXACT_CACHE_MAX_SIZE <= 0:
+        return
+    with _EXACT_CACHE_LOCK:
+        _EXACT_CACHE[key] = (payload, time.monotonic())
+        _EXACT_CACHE.move_to_end(key)
+        if len(_EXACT_CACHE) > EXACT_CACHE_MAX_SIZE:
+            _EXACT_CACHE.popitem(last=False)
+
+# Micro-batching configuration (CHAT_BATCH_SIZE=1 disables batching)
+CHAT_BATCH_SIZE = int(os.getenv("CHAT_BATCH_SIZE", "1"))
+CHAT_BATCH_WAIT_MS = float(os.getenv("CHAT_BATCH_WAIT_MS", "10"))
+chat_queue: Optional[asyncio.Queue] = None
+batch_task: Optional[asyncio.Task] = None
+
+# Startup warmup: one query per route so the first real request does not
+# pay for lazy model/embedding/LLM initialization. Opt-in - it costs real
+# LLM calls in every worker on each start; preloading the nodes covers the
+# one-time setup
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+# Build the RAG/escalation/classifier nodes before the first request
+STARTUP_PRELOAD = os.getenv("STARTUP_PRELOAD", "true").lower() == "true"
+WARMUP_QUERIES = [
+    "What is the price of SmartWatch Pro X?",
+    "What is your return policy?",
+    "What are your customer support hours?"
+]
+
+# Response timestamps are refreshed by a background task instead of being
+# formatted on every request; none of them need sub-50ms precision
+TIMESTAMP_REFRESH_SECONDS = 0.05
+_NOW_ISO: str = datetime.now().isoformat()
+tick_task: Optional[asyncio.Task] = None
+
+
+async def _tick():
+    """Refresh the cached ISO timestamp every TIMESTAMP_REFRESH_SECONDS"""
+    global _NOW_ISO
+    while True:
+        await asyncio.sleep(TIMESTAMP_REFRESH_SECONDS)
+        _NOW_ISO = datetime.now().isoformat()
+
+
+async def _drain_more(queue: asyncio.Queue, batch: list, max_items: int):
+    """Pull items from the queue into batch until it holds max_items"""
+    while len(batch) < max_items:
+        batch.append(await queue.get())
+
+
+async def _run_batch(batch: list, slots: asyncio.Semaphore):
+    """Run one drained batch through the workflow and resolve its futures"""
+    loop = asyncio.get_running_loop()
+    queries = [query for query, _ in batch]
+    try:
+        results = await loop.run_in_executor(
+            workflow_executor, _wf_box[0].run_batch, queries
+        )
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+    finally:
+        slots.release()
+    
+    for (_, future), result in zip(batch, results):
+        if not future.done():
+            future.set_result(result)
+
+
+async def batch_loop():
+    """
+    Background task that groups queued chat queries into batches
+    
+    Waits for the first query, gathers up to CHAT_BATCH_SIZE queries within
+    CHAT_BATCH_WAIT_MS and hands the batch to its own task, so the loop keeps
+    draining while earlier batches run. At most WORKFLOW_MAX_WORKERS batches
+    are in flight - one per executor thread.
+    """
+    slots = asyncio.Semaphore(WORKFLOW_MAX_WORKERS)
+    running: set = set()
+    try:
+        while True:
+            batch = [await chat_queue.get()]
+            try:
+                await asyncio.wait_for(
+                    _drain_more(chat_queue, batch, CHAT_BATCH_SIZE),
+                    timeout=CHAT_BATCH_WAIT_MS / 1000
+                )
+            except asyncio.TimeoutError:
+                pass
+            
+            await slots.acquire()
+            task = asyncio.create_task(_run_batch(batch, slots))
+            running.add(task)
+            task.add_done_callback(running.discard)
+    finally:
+        for task in running:
+            task.cancel()
+
+
+async def _warmup():
+    """Run WARMUP_QUERIES through the workflow; failures never block startup"""
+    loop = asyncio.get_running_loop()
+    for query in WARMUP_QUERIES:
+        try:
+            await loop.run_in_executor(
+                workflow_executor,
+                functools.partial(_wf_box[0].run, user_query=query, verbose=False)
+            )
+        except Exception as e:
+            logger.warning("Warmup query failed (%s): %s", query, e)
+    logger.info("Workflow warmed up with %d queries", len(WARMUP_QUERIES))
 
 
-@app.on_event("startup")
 async def startup_event():
     """Initialize the chatbot workflow on startup"""
-    global chatbot_workflow
+    global workflow_executor, chat_queue, batch_task, tick_task
+    log_listener.start()
+    tick_task = asyncio.create_task(_tick())
     try:
-        print("🚀 Starting FastAPI server...")
-        print("🤖 Initializing chatbot workflow...")
-        chatbot_workflow = get_workflow()
-        print("✅ Chatbot workflow initialized successfully!")
+        logger.info("Starting FastAPI server...")
+        # Generate and cache the OpenAPI schema before serving traffic
+        app.openapi()
+        workflow_executor = ThreadPoolExecutor(
+            max_workers=WORKFLOW_MAX_WORKERS,
+            thread_name_prefix="workflow"
+        )
+        logger.info("Initializing chatbot workflow...")
+        _wf_box[0] = get_workflow()
+        if STARTUP_PRELOAD:
+            try:
+                await asyncio.get_running_loop().run_in_executor(workflow_executor, preload)
+                logger.info("Workflow nodes preloaded")
+            except Exception as e:
+                logger.warning("Node preload failed, nodes will load on first use: %s", e)
+        _ready.set()
+        logger.info("Chatbot workflow initialized successfully")
+        
+        if STARTUP_WARMUP:
+            await _warmup()
+        
+        if CHAT_BATCH_SIZE > 1:
+            chat_queue = asyncio.Queue()
+            batch_task = asyncio.create_task(batch_loop())
+            logger.info(
+                "Micro-batching enabled (batch size: %s, wait: %sms)",
+                CHAT_BATCH_SIZE, CHAT_BATCH_WAIT_MS
+            )
     except Exception as e:
-        print(f"❌ Error initializing chatbot workflow: {str(e)}")
-        print("⚠️  API will start but chatbot may not function correctly")
+        logger.exception("Error initializing chatbot workflow: %s", e)
+        logger.warning("API will start but chatbot may not function correctly")
 
 
-@app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    print("👋 Shutting down FastAPI server...")
+    logger.info("Shutting down FastAPI server...")
+    _ready.clear()
+    if batch_task is not None:
+        batch_task.cancel()
+    if tick_task is not None:
+        tick_task.cancel()
+    if workflow_executor is not None:
+        workflow_executor.shutdown(wait=True)
+    log_listener.stop()
 
 
 # =============================================================================
@@ -174,7 +401,7 @@ async def health_check():
     return HealthResponse(
         status="healthy",
         version="1.0.0",
-        timestamp=datetime.now().isoformat()
+        timestamp=_NOW_ISO
     )
 
 
@@ -216,7 +443,7 @@ async def chat(request: ChatRequest):
     """
     try:
         # Validate workflow is initialized
-        if chatbot_workflow is None:
+        if not _ready.is_set():
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Chatbot workflow not initialized. Please try again later."
@@ -229,32 +456,67 @@ async def chat(request: ChatRequest):
                 detail="Query cannot be empty"
             )
         
-        # Process query through workflow
-        result = chatbot_workflow.run(
-            user_query=request.query.strip(),
-            verbose=False
-        )
+        wf = _wf_box[0]
+        query = request.query.strip()
+        loop = asyncio.get_running_loop()
+        
+        # Exact repeats are answered from the LRU without running the workflow
+        cache_key = query.lower()
+        cached = _exact_cache_get(cache_key)
+        if cached is not None:
+            return ORJSONResponse({
+                **cached,
+                "query": request.query,
+                "conversation_id": request.conversation_id or str(uuid.uuid4()),
+                "timestamp": _NOW_ISO
+            })
+        
+        if chat_queue is not None:
+            # Hand the query to the batching loop and wait for its result
+            future = loop.create_future()
+            await chat_queue.put((query, future))
+            result = await future
+        else:
+            # Process query through workflow in the thread pool so the
+            # event loop keeps serving other requests during the LLM call
+            result = await loop.run_in_executor(
+                workflow_executor,
+                functools.partial(
+                    wf.run,
+                    user_query=query,
+                    verbose=False
+                )
+            )
         
         # Extract response data
-        response_data = ChatResponse(
-            query=request.query,
-            response=result.get("final_response", "I apologize, but I couldn't generate a response."),
-            category=result.get("classified_category", "unknown"),
-            confidence=result.get("confidence_score", 0.0),
-            needs_escalation=result.get("needs_escalation", False),
-            conversation_id=request.conversation_id or result.get("conversation_id", ""),
-            timestamp=datetime.now().isoformat(),
-            metadata=result.get("metadata", {})
-        )
+        # The workflow output is trusted, so build the ChatResponse-shaped
+        # payload directly instead of re-validating it through pydantic.
+        # Returning a Response also skips FastAPI's response_model check;
+        # response_model is kept for the OpenAPI schema only.
+        response_data = {
+            "query": request.query,
+            "response": result.get("final_response", "I apologize, but I couldn't generate a response."),
+            "category": result.get("classified_category", "unknown"),
+            "confidence": result.get("confidence_score", 0.0),
+            "needs_escalation": result.get("needs_escalation", False),
+            "conversation_id": request.conversation_id or result.get("conversation_id", ""),
+            "timestamp": _NOW_ISO,
+            "metadata": result.get("metadata", {})
+        }
+        
+        # Failed runs (RAG error fallback) are not cached, so a transient
+        # LLM error is not served again for this query
+        failed = result.get("metadata", {}).get("error") or not result.get("final_response")
+        if not failed:
+            _exact_cache_put(cache_key, response_data)
         
-        return response_data
+        return ORJSONResponse(response_data)
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        # Log error (in production, use proper logging)
-        print(f"❌ Error processing chat request: {str(e)}")
+        logger.exception("Error processing chat request: %s", e)
         
         # Return error response
         raise HTTPException(
@@ -263,44 +525,122 @@ async def chat(request: ChatRequest):
         )
 
 
+@app.post(
+    "/chat/stream",
+    summary="Chat with the bot (streaming)",
+    description="Send a query and receive the response as Server-Sent Events",
+    response_class=StreamingResponse
+)
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint
+    
+    Runs the same classification and routing as ``/chat`` but streams the
+    answer as it is generated. Each event is ``data: {"t": "<chunk>"}``;
+    the stream ends with ``data: [DONE]``.
+    """
+    if not _ready.is_set():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chatbot workflow not initialized. Please try again later."
+        )
+    
+    query = request.query.strip()
+    if not query:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query cannot be empty"
+        )
+    
+    wf = _wf_box[0]
+    
+    async def event_stream():
+        try:
+            async for chunk in wf.arun_stream(query):
+                yield b"data: " + orjson.dumps({"t": chunk}) + b"\n\n"
+        except Exception as e:
+            logger.exception("Error streaming chat response: %s", e)
+            yield b"data: " + orjson.dumps({"error": "Error processing request"}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+# Static payloads are serialized once at import time; the handlers below
+# serve the pre-built bytes and answer conditional requests with 304
+CATEGORIES_PAYLOAD = {
+    "categories": [
+        {
+            "name": "product",
+            "description": "Product information, pricing, features, specifications",
+            "examples": [
+                "What is the price of SmartWatch Pro X?",
+                "Tell me about Wireless Earbuds features",
+                "Does the power bank support fast charging?"
+            ]
+        },
+        {
+            "name": "returns",
+            "description": "Returns, refunds, exchanges, defective products",
+            "examples": [
+                "How do I return a product?",
+                "I want a refund for my order",
+                "Can I exchange my defective earbuds?"
+            ]
+        },
+        {
+            "name": "general",
+            "description": "General support, payment, shipping, contact info",
+            "examples": [
+                "What are your customer support hours?",
+                "Do you accept cash on delivery?",
+                "What payment methods do you accept?"
+            ]
+        }
+    ]
+}
+
+PRODUCTS_PAYLOAD = {
+    "products": [
+        {
+            "name": "SmartWatch Pro X",
+            "price": "₹15,999",
+            "description": "Fitness and lifestyle companion with heart rate monitoring, GPS tracking, and 7-day battery life"
+        },
+        {
+            "name": "Wireless Earbuds Elite",
+            "price": "₹4,999",
+            "description": "Premium earbuds with Active Noise Cancellation, 24-hour battery, and IPX4 water resistance"
+        },
+        {
+            "name": "Power Bank Ultra 20000mAh",
+            "price": "₹2,499",
+            "description": "High-capacity power bank with 22.5W fast charging and dual USB ports"
+        }
+    ]
+}
+
+_CATEGORIES_JSON = orjson.dumps(CATEGORIES_PAYLOAD)
+_CATEGORIES_ETAG = f'"{hashlib.blake2b(_CATEGORIES_JSON).hexdigest()[:16]}"'
+_PRODUCTS_JSON = orjson.dumps(PRODUCTS_PAYLOAD)
+_PRODUCTS_ETAG = f'"{hashlib.blake2b(_PRODUCTS_JSON).hexdigest()[:16]}"'
+
+
+def _static_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve pre-serialized JSON, or 304 if the client already has it"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get(
     "/categories",
     summary="Get supported categories",
     description="List all query categories supported by the chatbot"
 )
-async def get_categories():
+async def get_categories(request: Request):
     """Get list of supported query categories"""
-    return {
-        "categories": [
-            {
-                "name": "product",
-                "description": "Product information, pricing, features, specifications",
-                "examples": [
-                    "What is the price of SmartWatch Pro X?",
-                    "Tell me about Wireless Earbuds features",
-                    "Does the power bank support fast charging?"
-                ]
-            },
-            {
-                "name": "returns",
-                "description": "Returns, refunds, exchanges, defective products",
-                "examples": [
-                    "How do I return a product?",
-                    "I want a refund for my order",
-                    "Can I exchange my defective earbuds?"
-                ]
-            },
-            {
-                "name": "general",
-                "description": "General support, payment, shipping, contact info",
-                "examples": [
-                    "What are your customer support hours?",
-                    "Do you accept cash on delivery?",
-                    "What payment methods do you accept?"
-                ]
-            }
-        ]
-    }
+    return _static_json_response(request, _CATEGORIES_JSON, _CATEGORIES_ETAG)
 
 
 @app.get(
@@ -308,27 +648,9 @@ async def get_categories():
     summary="Get product list",
     description="List all products in the knowledge base"
 )
-async def get_products():
+async def get_products(request: Request):
     """Get list of available products"""
-    return {
-        "products": [
-            {
-                "name": "SmartWatch Pro X",
-                "price": "₹15,999",
-                "description": "Fitness and lifestyle companion with heart rate monitoring, GPS tracking, and 7-day battery life"
-            },
-            {
-                "name": "Wireless Earbuds Elite",
-                "price": "₹4,999",
-                "description": "Premium earbuds with Active Noise Cancellation, 24-hour battery, and IPX4 water resistance"
-            },
-            {
-                "name": "Power Bank Ultra 20000mAh",
-                "price": "₹2,499",
-                "description": "High-capacity power bank with 22.5W fast charging and dual USB ports"
-            }
-        ]
-    }
+    return _static_json_response(request, _PRODUCTS_JSON, _PRODUCTS_ETAG)
 
 
 # =============================================================================
@@ -338,11 +660,11 @@ async def get_products():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _NOW_ISO
         }
     )
 
@@ -350,12 +672,12 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Internal server error",
             "detail": str(exc),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _NOW_ISO
         }
     )
 
@@ -366,18 +688,35 @@ async def general_exception_handler(request, exc):
 
 if __name__ == "__main__":
     """Run the API server"""
+    # DEV=1 keeps the single auto-reloading worker for local development
+    dev_mode = os.getenv("DEV", "0") == "1"
+    workers = 1 if dev_mode else int(os.getenv("WORKERS", os.cpu_count() or 1))
+    
     print("="*70)
     print("🚀 Starting TechGear Electronics Customer Support Chatbot API")
     print("="*70)
     print(f"\n📍 API will be available at: http://localhost:8000")
     print(f"📚 API Documentation: http://localhost:8000/docs")
     print(f"📖 ReDoc: http://localhost:8000/redoc")
+    print(f"⚙️  Mode: {'development (reload)' if dev_mode else f'production ({workers} workers)'}")
     print(f"\n{'='*70}\n")
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Enable auto-reload for development
-        log_level="info"
-    )
+    if dev_mode:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,  # Enable auto-reload for development
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            workers=workers,
+            reload=False,
+            log_level="info"
+        )
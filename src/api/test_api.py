@@ -3,8 +3,9 @@ API Test Client
 Test the FastAPI chatbot endpoints
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import orjson
 from typing import Dict, Any
 
 # API base URL
@@ -12,47 +13,61 @@ BASE_URL = "http://localhost:8000"
 
 
 class ChatbotAPIClient:
-    """Client for testing the chatbot API"""
+    """Async client for testing the chatbot API"""
     
     def __init__(self, base_url: str = BASE_URL):
         """Initialize API client"""
         self.base_url = base_url
-        self.session = requests.Session()
+        # One pooled HTTP/2 client so concurrent requests share connections
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    
+    async def close(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
     
-    def health_check(self) -> Dict[str, Any]:
+    async def health_check(self) -> Dict[str, Any]:
         """Check API health"""
-        response = self.session.get(f"{self.base_url}/health")
+        response = await self._client.get(f"{self.base_url}/health")
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
-    def chat(self, query: str, conversation_id: str = None) -> Dict[str, Any]:
+    async def chat(self, query: str, conversation_id: str = None) -> Dict[str, Any]:
         """Send a chat message"""
         payload = {"query": query}
         if conversation_id:
             payload["conversation_id"] = conversation_id
         
-        response = self.session.post(
+        response = await self._client.post(
             f"{self.base_url}/chat",
             json=payload
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
-    def get_categories(self) -> Dict[str, Any]:
+    async def get_categories(self) -> Dict[str, Any]:
         """Get supported categories"""
-        response = self.session.get(f"{self.base_url}/categories")
+        response = await self._client.get(f"{self.base_url}/categories")
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
-    def get_products(self) -> Dict[str, Any]:
+    async def get_products(self) -> Dict[str, Any]:
         """Get product list"""
-        response = self.session.get(f"{self.base_url}/products")
+        response = await self._client.get(f"{self.base_url}/products")
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
 
 
 def test_api():
     """Test the chatbot API"""
+    asyncio.run(_test_api())
+
+
+async def _test_api():
+    """Open a client and run the endpoint tests"""
     print("="*70)
     print("🧪 TESTING CHATBOT API")
     print("="*70)
@@ -60,12 +75,20 @@ def test_api():
     # Initialize client
     client = ChatbotAPIClient()
     
+    try:
+        await _run_tests(client)
+    finally:
+        await client.close()
+
+
+async def _run_tests(client: ChatbotAPIClient):
+    """Run all endpoint tests against an open client"""
     # Test 1: Health check
     print("\n" + "="*70)
     print("TEST 1: Health Check")
     print("="*70)
     try:
-        health = client.health_check()
+        health = await client.health_check()
         print(f"✅ Status: {health['status']}")
         print(f"   Version: {health['version']}")
         print(f"   Timestamp: {health['timestamp']}")
@@ -73,84 +96,66 @@ def test_api():
         print(f"❌ Health check failed: {str(e)}")
         return
     
+    # Fire the remaining requests concurrently; results are printed in order
+    chat_cases = [
+        ("Product Query", "What is the price of SmartWatch Pro X?", "test_conv_1", None),
+        ("Returns Query", "How do I return a product?", "test_conv_2", 150),
+        ("General Query", "What are your customer support hours?", "test_conv_3", None),
+    ]
+    
+    categories, products, *chat_results = await asyncio.gather(
+        client.get_categories(),
+        client.get_products(),
+        *[client.chat(query, conv_id) for _, query, conv_id, _ in chat_cases],
+        return_exceptions=True
+    )
+    
     # Test 2: Get categories
     print("\n" + "="*70)
     print("TEST 2: Get Categories")
     print("="*70)
-    try:
-        categories = client.get_categories()
+    if isinstance(categories, Exception):
+        print(f"❌ Get categories failed: {str(categories)}")
+    else:
         print(f"✅ Found {len(categories['categories'])} categories:")
         for cat in categories['categories']:
             print(f"\n   📂 {cat['name'].upper()}")
             print(f"      {cat['description']}")
             print(f"      Example: {cat['examples'][0]}")
-    except Exception as e:
-        print(f"❌ Get categories failed: {str(e)}")
     
     # Test 3: Get products
     print("\n" + "="*70)
     print("TEST 3: Get Products")
     print("="*70)
-    try:
-        products = client.get_products()
+    if isinstance(products, Exception):
+        print(f"❌ Get products failed: {str(products)}")
+    else:
         print(f"✅ Found {len(products['products'])} products:")
         for prod in products['products']:
             print(f"\n   📦 {prod['name']}")
             print(f"      Price: {prod['price']}")
             print(f"      {prod['description'][:60]}...")
-    except Exception as e:
-        print(f"❌ Get products failed: {str(e)}")
     
-    # Test 4: Chat - Product query
-    print("\n" + "="*70)
-    print("TEST 4: Chat - Product Query")
-    print("="*70)
-    test_query = "What is the price of SmartWatch Pro X?"
-    print(f"Query: {test_query}")
-    try:
-        response = client.chat(test_query, "test_conv_1")
+    # Tests 4-6: Chat queries
+    for test_num, ((label, query, _, preview), response) in enumerate(
+        zip(chat_cases, chat_results), 4
+    ):
+        print("\n" + "="*70)
+        print(f"TEST {test_num}: Chat - {label}")
+        print("="*70)
+        print(f"Query: {query}")
+        if isinstance(response, Exception):
+            print(f"❌ Chat failed: {str(response)}")
+            continue
         print(f"\n✅ Response received:")
         print(f"   Category: {response['category']}")
         print(f"   Confidence: {response['confidence']:.2f}")
         print(f"   Escalation: {response['needs_escalation']}")
         print(f"\n   💬 Response:")
-        print(f"   {response['response']}")
-    except Exception as e:
-        print(f"❌ Chat failed: {str(e)}")
-    
-    # Test 5: Chat - Returns query
-    print("\n" + "="*70)
-    print("TEST 5: Chat - Returns Query")
-    print("="*70)
-    test_query = "How do I return a product?"
-    print(f"Query: {test_query}")
-    try:
-        response = client.chat(test_query, "test_conv_2")
-        print(f"\n✅ Response received:")
-        print(f"   Category: {response['category']}")
-        print(f"   Confidence: {response['confidence']:.2f}")
-        print(f"   Escalation: {response['needs_escalation']}")
-        print(f"\n   💬 Response:")
-        print(f"   {response['response'][:150]}...")
-    except Exception as e:
-        print(f"❌ Chat failed: {str(e)}")
-    
-    # Test 6: Chat - General query
-    print("\n" + "="*70)
-    print("TEST 6: Chat - General Query")
-    print("="*70)
-    test_query = "What are your customer support hours?"
-    print(f"Query: {test_query}")
-    try:
-        response = client.chat(test_query, "test_conv_3")
-        print(f"\n✅ Response received:")
-        print(f"   Category: {response['category']}")
-        print(f"   Confidence: {response['confidence']:.2f}")
-        print(f"   Escalation: {response['needs_escalation']}")
-        print(f"\n   💬 Response:")
-        print(f"   {response['response']}")
-    except Exception as e:
-        print(f"❌ Chat failed: {str(e)}")
+        if preview:
+            print(f"   {response['response'][:preview]}...")
+        else:
+            print(f"   {response['response']}")
     
     # Summary
     print("\n" + "="*70)
@@ -169,7 +174,7 @@ if __name__ == "__main__":
     
     try:
         test_api()
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("\n❌ ERROR: Cannot connect to API")
         print("   Please start the API server first:")
         print("   python src/api/main.py")
@@ -0,0 +1,31 @@
+"""
+Shared pytest fixtures for the RAG chain test scripts
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src/ to path for package imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def rag():
+    """
+    One RAG chain (LLM, retriever, embeddings) for the whole test session
+    
+    Skips dependent tests when no Gemini API key is configured.
+    """
+    from bot.rag_chain import enable_llm_cache, get_rag_chain
+    
+    if not os.getenv("GEMINI_API_KEY"):
+        pytest.skip("GEMINI_API_KEY not set")
+    
+    # Repeated test runs reuse cached generations for unchanged prompts
+    enable_llm_cache()
+    
+    rag_chain = get_rag_chain()
+    rag_chain.ensure_chain()
+    return rag_chain
@@ -2,25 +2,17 @@
 Test RAG Chain's strict adherence to retrieved context
 """
 
+import asyncio
 import sys
 import os
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-services_dir = os.path.join(parent_dir, 'services')
-sys.path.insert(0, services_dir)
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from rag_chain import RAGChain
-
-print("\n" + "="*70)
-print("  RAG CHAIN CONTEXT ADHERENCE TESTING")
-print("="*70)
-
-# Initialize RAG chain
-rag = RAGChain()
-rag.build_chain()
+from bot.rag_chain import enable_llm_cache, get_rag_chain
 
 # Test cases
-test_cases = [
+TEST_CASES = [
     {
         "query": "What is the price of SmartWatch Pro X?",
         "category": "In Knowledge Base",
@@ -48,62 +40,101 @@ test_cases = [
     }
 ]
 
-print(f"\n🧪 Testing {len(test_cases)} context adherence scenarios")
-print("="*70)
 
-results = []
-for i, test in enumerate(test_cases, 1):
-    print(f"\n{'─'*70}")
-    print(f"Test Case {i}: {test['category']}")
-    print(f"{'─'*70}")
-    print(f"Query: {test['query']}")
-    print(f"Expected: {test['expected']}")
+def run_context_adherence_tests(rag):
+    """
+    Run the context adherence scenarios against a RAG chain
+    
+    Args:
+        rag: Initialized RAGChain (shared with other tests)
+        
+    Returns:
+        List of result dicts with query, category and adheres
+    """
+    print("\n" + "="*70)
+    print("  RAG CHAIN CONTEXT ADHERENCE TESTING")
+    print("="*70)
+    
+    print(f"\n🧪 Testing {len(TEST_CASES)} context adherence scenarios")
+    print("="*70)
+    
+    # Run all test queries concurrently, then evaluate in order
+    async def run_queries():
+        return await asyncio.gather(*(rag.aquery(test['query']) for test in TEST_CASES))
+    
+    responses = asyncio.run(run_queries())
     
-    # Get response
-    response = rag.query(test['query'], verbose=False)
+    results = []
+    for i, (test, response) in enumerate(zip(TEST_CASES, responses), 1):
+        print(f"\n{'─'*70}")
+        print(f"Test Case {i}: {test['category']}")
+        print(f"{'─'*70}")
+        print(f"Query: {test['query']}")
+        print(f"Expected: {test['expected']}")
+        
+        print(f"\n📝 Response:")
+        print(f"   {response}")
+        
+        # Check if response adheres to context
+        if test['category'] == "Out of Knowledge Base":
+            adheres = "don't have" in response.lower() or "not found" in response.lower() or "no information" in response.lower()
+        else:
+            adheres = "don't have" not in response.lower()
+        
+        status = "✅ PASS" if adheres else "❌ FAIL"
+        print(f"\n{status} - Context adherence: {'Yes' if adheres else 'No'}")
+        
+        results.append({
+            "query": test['query'],
+            "category": test['category'],
+            "adheres": adheres
+        })
     
-    print(f"\n📝 Response:")
-    print(f"   {response}")
+    # Summary
+    print(f"\n{'='*70}")
+    print(f"  TEST SUMMARY")
+    print(f"{'='*70}")
     
-    # Check if response adheres to context
-    if test['category'] == "Out of Knowledge Base":
-        adheres = "don't have" in response.lower() or "not found" in response.lower() or "no information" in response.lower()
+    passed = sum(1 for r in results if r['adheres'])
+    total = len(results)
+    
+    print(f"\n✅ Passed: {passed}/{total} ({passed/total*100:.1f}%)")
+    print(f"❌ Failed: {total-passed}/{total}")
+    
+    print(f"\n📊 Results by Category:")
+    for result in results:
+        status = "✅ PASS" if result['adheres'] else "❌ FAIL"
+        print(f"   {status} - {result['category']}")
+    
+    if passed == total:
+        print(f"\n🎉 ALL TESTS PASSED! RAG chain strictly adheres to context.")
+        print(f"✅ Only answers from knowledge base")
+        print(f"✅ Correctly refuses out-of-scope questions")
     else:
-        adheres = "don't have" not in response.lower()
+        print(f"\n⚠️  Some tests failed. Review context adherence.")
     
-    status = "✅ PASS" if adheres else "❌ FAIL"
-    print(f"\n{status} - Context adherence: {'Yes' if adheres else 'No'}")
+    print(f"\n{'='*70}")
+    print(f"  ✅ CONTEXT ADHERENCE TESTING COMPLETE")
+    print(f"{'='*70}")
     
-    results.append({
-        "query": test['query'],
-        "category": test['category'],
-        "adheres": adheres
-    })
+    return results
 
-# Summary
-print(f"\n{'='*70}")
-print(f"  TEST SUMMARY")
-print(f"{'='*70}")
 
-passed = sum(1 for r in results if r['adheres'])
-total = len(results)
+def test_sample_queries(rag):
+    """Sample product/policy queries run against the shared chain"""
+    rag.test_rag_chain()
 
-print(f"\n✅ Passed: {passed}/{total} ({passed/total*100:.1f}%)")
-print(f"❌ Failed: {total-passed}/{total}")
 
-print(f"\n📊 Results by Category:")
-for result in results:
-    status = "✅ PASS" if result['adheres'] else "❌ FAIL"
-    print(f"   {status} - {result['category']}")
+def test_context_adherence(rag):
+    """Every scenario answers from context or refuses out-of-scope questions"""
+    results = run_context_adherence_tests(rag)
+    failed = [r['query'] for r in results if not r['adheres']]
+    assert not failed, f"Context adherence failed for: {failed}"
 
-if passed == total:
-    print(f"\n🎉 ALL TESTS PASSED! RAG chain strictly adheres to context.")
-    print(f"✅ Only answers from knowledge base")
-    print(f"✅ Correctly refuses out-of-scope questions")
-else:
-    print(f"\n⚠️  Some tests failed. Review context adherence.")
-
-print(f"\n{'='*70}")
-print(f"  ✅ CONTEXT ADHERENCE TESTING COMPLETE")
-print(f"{'='*70}")
 
+if __name__ == "__main__":
+    # Repeated test runs reuse cached generations for unchanged prompts
+    enable_llm_cache()
+    
+    # Shared RAG chain - LLM and retriever are initialized on first query
+    run_context_adherence_tests(get_rag_chain())
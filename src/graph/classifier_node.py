@@ -3,20 +3,28 @@ Query Classifier Node - LangGraph Node Implementation
 Classifies user queries using rule-based keyword matching
 """
 
+import functools
 import re
 import os
 import sys
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, FrozenSet, List, Tuple
 
-# Add current directory to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.insert(0, current_dir)
+import numpy as np
 
-from state import ChatbotState, update_state
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from graph.state import ROUTE_TABLE, ChatbotState, update_state
 
-# Keyword patterns for each category
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional - fall back to fused regexes
+    ahocorasick = None
+
+
+# Keyword patterns for each category (lowercase - queries are lowercased
+# in preprocess_query and matched case-sensitively)
 CATEGORY_KEYWORDS = {
     "product": [
         # Product names
@@ -65,6 +73,96 @@ CATEGORY_KEYWORDS = {
 }
 
 
+# Every keyword pattern gets a global id; PATTERN_CATEGORY maps id -> category
+CATEGORY_NAMES: Tuple[str, ...] = tuple(CATEGORY_KEYWORDS)
+PATTERN_CATEGORY = np.array(
+    [index for index, patterns in enumerate(CATEGORY_KEYWORDS.values()) for _ in patterns],
+    dtype=np.intp
+)
+
+
+def split_keywords(category_keywords: Dict[str, List[str]]):
+    """
+    Split keyword literals into single-word and multi-word groups
+    
+    Every pattern is a plain ``|``-separated list of literals. Single-word
+    literals can only match inside one whitespace token of the query, so they
+    are matched per token (and memoized); multi-word literals are matched
+    against the whole query.
+    
+    Args:
+        category_keywords: Mapping of category to keyword patterns
+        
+    Returns:
+        Tuple of (word_literals, phrase_literals), each mapping a literal to
+        the ids of the patterns it belongs to
+    """
+    word_literals: Dict[str, List[int]] = {}
+    phrase_literals: Dict[str, List[int]] = {}
+    pattern_id = 0
+    for patterns in category_keywords.values():
+        for pattern in patterns:
+            for literal in pattern.split("|"):
+                target = phrase_literals if " " in literal else word_literals
+                target.setdefault(literal, []).append(pattern_id)
+            pattern_id += 1
+    return word_literals, phrase_literals
+
+
+def build_matcher(literals: Dict[str, List[int]]) -> Callable[[str], FrozenSet[int]]:
+    """
+    Build a multi-literal matcher returning the pattern ids found in a text
+    
+    Uses a single Aho-Corasick automaton when pyahocorasick is installed,
+    otherwise one fused regex with a lookahead group per literal so
+    overlapping literals are all reported.
+    
+    Args:
+        literals: Mapping of literal to pattern ids
+        
+    Returns:
+        Function mapping text to the frozenset of matched pattern ids
+    """
+    if not literals:
+        return lambda text: frozenset()
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for literal, pattern_ids in literals.items():
+            automaton.add_word(literal, tuple(pattern_ids))
+        automaton.make_automaton()
+        
+        def match(text: str) -> FrozenSet[int]:
+            return frozenset(pid for _, pattern_ids in automaton.iter(text) for pid in pattern_ids)
+        return match
+    
+    group_ids = list(literals.values())
+    fused = re.compile("|".join(f"(?=({re.escape(literal)}))" for literal in literals))
+    
+    def match(text: str) -> FrozenSet[int]:
+        return frozenset(pid for m in fused.finditer(text) for pid in group_ids[m.lastindex - 1])
+    return match
+
+
+_WORD_LITERALS, _PHRASE_LITERALS = split_keywords(CATEGORY_KEYWORDS)
+_match_words = build_matcher(_WORD_LITERALS)
+_match_phrases = build_matcher(_PHRASE_LITERALS)
+
+
+@functools.lru_cache(maxsize=4096)
+def token_pattern_ids(token: str) -> FrozenSet[int]:
+    """
+    Pattern ids matched inside one query token (memoized)
+    
+    Args:
+        token: Lowercased whitespace-delimited token
+        
+    Returns:
+        Frozenset of matched pattern ids
+    """
+    return _match_words(token)
+
+
 class QueryClassifier:
     """
     Rule-based query classifier using keyword matching
@@ -73,6 +171,13 @@ class QueryClassifier:
     def __init__(self):
         """Initialize the classifier"""
         self.categories = list(CATEGORY_KEYWORDS.keys())
+        
+        # Fast path: single-keyword queries ("refund", "price") map straight
+        # to their precomputed classification without running the matchers
+        self.fast_path = {
+            keyword: self.build_result(self.score_vector(keyword))
+            for keyword in _WORD_LITERALS
+        }
         print(f"✅ QueryClassifier initialized")
         print(f"   Categories: {', '.join(self.categories)}")
     
@@ -90,24 +195,42 @@ class QueryClassifier:
         processed = query.lower().strip()
         return processed
     
-    def match_keywords(self, query: str, keywords: List[str]) -> Tuple[bool, int]:
+    def score_vector(self, query: str) -> List[int]:
         """
-        Match keywords in query using regex patterns
+        Count matching keyword patterns per category, in CATEGORY_NAMES order
+        
+        Single-word keywords are resolved per token through a memoized
+        lookup, multi-word keywords by one scan of the query; the matched
+        pattern ids are then tallied per category with ``np.bincount``.
+        Each pattern counts at most once.
         
         Args:
             query: Preprocessed query
-            keywords: List of regex patterns to match
             
         Returns:
-            Tuple of (matched: bool, match_count: int)
+            List of match counts indexed like CATEGORY_NAMES
         """
-        match_count = 0
+        matched = set(_match_phrases(query))
+        for token in query.split():
+            matched.update(token_pattern_ids(token))
         
-        for pattern in keywords:
-            if re.search(pattern, query, re.IGNORECASE):
-                match_count += 1
+        counts = np.bincount(
+            PATTERN_CATEGORY[list(matched)], minlength=len(CATEGORY_NAMES)
+        ) if matched else np.zeros(len(CATEGORY_NAMES), dtype=np.intp)
         
-        return match_count > 0, match_count
+        return counts.tolist()
+    
+    def score_categories(self, query: str) -> Dict[str, int]:
+        """
+        Count matching keyword patterns per category
+        
+        Args:
+            query: Preprocessed query
+            
+        Returns:
+            Dict mapping category to number of matched patterns
+        """
+        return dict(zip(CATEGORY_NAMES, self.score_vector(query)))
     
     def classify(self, query: str) -> Dict[str, any]:
         """
@@ -122,15 +245,33 @@ class QueryClassifier:
         # Preprocess query
         processed_query = self.preprocess_query(query)
         
-        # Score each category
-        category_scores = {}
+        # Single-keyword query: O(1) lookup of the precomputed result
+        fast = self.fast_path.get(processed_query)
+        if fast is not None:
+            return {**fast, "scores": dict(fast["scores"])}
         
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            matched, count = self.match_keywords(processed_query, keywords)
-            category_scores[category] = count
+        # Score each category
+        return self.build_result(self.score_vector(processed_query))
+    
+    def build_result(self, scores: List[int]) -> Dict[str, any]:
+        """
+        Turn per-category scores into a classification result
         
-        # Determine best category
-        max_score = max(category_scores.values())
+        Args:
+            scores: Match counts indexed like CATEGORY_NAMES
+            
+        Returns:
+            Classification result dict with category and confidence
+        """
+        # One pass for max, argmax (first wins on ties) and total
+        best_index = 0
+        max_score = 0
+        total_matches = 0
+        for index, score in enumerate(scores):
+            total_matches += score
+            if score > max_score:
+                max_score = score
+                best_index = index
         
         if max_score == 0:
             # No keywords matched - classify as general
@@ -138,11 +279,10 @@ class QueryClassifier:
             confidence = 0.3  # Low confidence
         else:
             # Get category with highest score
-            classified_category = max(category_scores, key=category_scores.get)
+            classified_category = CATEGORY_NAMES[best_index]
             
             # Calculate confidence score
-            total_matches = sum(category_scores.values())
-            confidence = category_scores[classified_category] / total_matches if total_matches > 0 else 0.5
+            confidence = max_score / total_matches
             
             # Boost confidence if significantly higher than others
             if max_score > 1:
@@ -151,7 +291,7 @@ class QueryClassifier:
         return {
             "category": classified_category,
             "confidence": round(confidence, 2),
-            "scores": category_scores
+            "scores": dict(zip(CATEGORY_NAMES, scores))
         }
     
     def explain_classification(self, query: str, result: Dict) -> str:
@@ -177,6 +317,23 @@ class QueryClassifier:
         return explanation
 
 
+# Global classifier instance (singleton)
+_classifier_instance = None
+
+
+def get_classifier() -> QueryClassifier:
+    """
+    Get or create classifier instance (singleton)
+    
+    Returns:
+        QueryClassifier instance
+    """
+    global _classifier_instance
+    if _classifier_instance is None:
+        _classifier_instance = QueryClassifier()
+    return _classifier_instance
+
+
 def classifier_node(state: ChatbotState) -> ChatbotState:
     """
     LangGraph node that classifies the user query
@@ -198,11 +355,12 @@ def classifier_node(state: ChatbotState) -> ChatbotState:
             state,
             classified_category="general",
             confidence_score=0.0,
+            _next_node=ROUTE_TABLE["general"],
             metadata={"error": "Empty query"}
         )
     
-    # Initialize classifier
-    classifier = QueryClassifier()
+    # Get singleton classifier instance
+    classifier = get_classifier()
     
     # Classify the query
     result = classifier.classify(user_query)
@@ -212,6 +370,8 @@ def classifier_node(state: ChatbotState) -> ChatbotState:
         state,
         classified_category=result["category"],
         confidence_score=result["confidence"],
+        # Routing decided here so the workflow router is a single key read
+        _next_node=ROUTE_TABLE.get(result["category"], "escalation"),
         metadata={
             "classification_scores": result["scores"],
             "classifier_type": "rule-based"
@@ -289,7 +449,7 @@ def test_with_state():
     """
     Test classifier node with ChatbotState
     """
-    from state import create_initial_state
+    from graph.state import create_initial_state
     
     print(f"\n{'='*70}")
     print(f"  TESTING CLASSIFIER NODE WITH STATE")
@@ -3,19 +3,82 @@ RAG Response Node
 LangGraph node that uses the RAG chain to generate answers for product and return-related queries
 """
 
+import hashlib
+import logging
 import os
 import sys
-from typing import Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
-# Add parent directories to path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-bot_dir = os.path.join(parent_dir, 'bot')
-sys.path.insert(0, bot_dir)
-sys.path.insert(0, parent_dir)
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from bot.rag_chain import RAGChain
-from graph.state import ChatbotState, update_state
+from graph.state import (
+    RAG_CATEGORIES,
+    ChatbotState,
+    DocRef,
+    dequantize_embedding,
+    quantize_embedding,
+    store_chunk,
+    update_state,
+)
+
+logger = logging.getLogger(__name__)
+
+# Banner lines for console output
+_BAR = '=' * 70
+_TOP = '\n' + _BAR
+_DIV = '-' * 70
+_DIV_TOP = '\n' + _DIV
+_HASH = '#' * 70
+_HASH_TOP = '\n' + _HASH
+
+# Exact-match LRU of generated responses, keyed on the normalized query
+# (0 disables it). Entries expire after RAG_NODE_CACHE_TTL seconds (0 = never)
+# and when the knowledge base is reloaded
+RAG_NODE_CACHE_SIZE = int(os.getenv("RAG_NODE_CACHE_SIZE", "256"))
+RAG_NODE_CACHE_TTL = float(os.getenv("RAG_NODE_CACHE_TTL", "300"))
+
+# LRU of retrieved documents keyed by a digest of the query embedding, so
+# differently worded queries that embed identically share one vector search
+# (0 disables it)
+RAG_RETRIEVAL_CACHE_SIZE = int(os.getenv("RAG_RETRIEVAL_CACHE_SIZE", "2000"))
+
+# Shared pool for batched generation; its size caps the concurrent
+# retrieval + LLM calls across every generate_responses caller
+RAG_BATCH_MAX_WORKERS = int(os.getenv("RAG_BATCH_MAX_WORKERS", "4"))
+_BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, RAG_BATCH_MAX_WORKERS),
+    thread_name_prefix="rag-batch"
+)
+
+# Silence the test harness output when run as a script / benchmark
+CHATBOT_TEST_QUIET = os.getenv("CHATBOT_TEST_QUIET", "false").lower() == "true"
+
+# Returned in place of an answer when retrieval or generation fails
+_FALLBACK_ERROR_MSG = (
+    "I apologize, but I encountered an error processing your request. "
+    "Please try again or contact our support team."
+)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivial variants share a cache key"""
+    return ' '.join(query.lower().split())
+
+
+def embedding_key(embedding: Sequence[float]) -> str:
+    """
+    Retrieval cache key: digest of the int8-quantized embedding
+    
+    Quantizing first gives a freshly computed embedding and its round trip
+    through the state the same key.
+    """
+    return hashlib.blake2b(quantize_embedding(embedding), digest_size=16).hexdigest()
 
 
 class RAGResponseNode:
@@ -27,31 +90,31 @@ class RAGResponseNode:
     def __init__(self):
         """Initialize RAG Response Node"""
         self.rag_chain = None
+        # normalized query -> (kb_version, stored_at, result)
+        self._cache: "OrderedDict[str, Tuple[Optional[int], float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # embedding digest -> (knowledge base version, documents)
+        self._retrieval_cache: "OrderedDict[str, Tuple[int, List[Any]]]" = OrderedDict()
+        self._retrieval_lock = threading.Lock()
         self.initialize_rag_chain()
     
     def initialize_rag_chain(self):
         """
         Initialize and build the RAG chain
         """
-        print(f"\n{'='*70}")
+        print(_TOP)
         print(f"🤖 Initializing RAG Response Node")
-        print(f"{'='*70}")
+        print(_BAR)
         
         try:
-            # Create RAG chain instance
-            self.rag_chain = RAGChain(
-                temperature=0.3,  # Low temperature for factual responses
-                top_k=3           # Retrieve top 3 relevant documents
-            )
+            # Imported here so LangChain/Gemini load only when RAG is used
+            from bot.rag_chain import get_rag_chain
             
-            # Initialize LLM
-            self.rag_chain.initialize_llm()
+            # Shared RAG chain instance (temperature 0.3, top 3 documents)
+            self.rag_chain = get_rag_chain()
             
-            # Initialize retriever
-            self.rag_chain.initialize_retriever()
-            
-            # Build the RAG chain
-            self.rag_chain.build_chain()
+            # Build LLM, retriever and chain eagerly so the node is warm
+            self.rag_chain.ensure_chain()
             
             print(f"\n✅ RAG Response Node initialized successfully!")
             print(f"   Ready to generate context-aware responses")
@@ -70,65 +133,191 @@ class RAGResponseNode:
         Returns:
             bool: True if RAG should be used, False otherwise
         """
-        # Use RAG for product and general queries
-        # Returns/issues will be handled by escalation node
-        rag_categories = ['product', 'general', 'product_inquiry', 'general_inquiry']
-        return category in rag_categories if category else False
+        return category in RAG_CATEGORIES
+    
+    def _kb_version(self) -> Optional[int]:
+        """Knowledge base version of the retriever (None without one)"""
+        return getattr(self.rag_chain.retriever_service, 'kb_version', None)
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result and mark it most recently used"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            kb_version, stored_at, cached = entry
+            if kb_version != self._kb_version() or (
+                RAG_NODE_CACHE_TTL > 0 and time.monotonic() - stored_at > RAG_NODE_CACHE_TTL
+            ):
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return dict(cached)
+    
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        """Insert a result, evicting the least recently used entry when full"""
+        if RAG_NODE_CACHE_SIZE <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (self._kb_version(), time.monotonic(), result)
+            self._cache.move_to_end(key)
+            if len(self._cache) > RAG_NODE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def retrieve(
+        self,
+        query: str,
+        embedding: Optional[Sequence[float]] = None
+    ) -> Tuple[List[Any], Optional[Sequence[float]]]:
+        """
+        Retrieve documents for a query through the embedding-keyed cache
+        
+        Entries are dropped once the retriever's knowledge base version
+        changes (the vector store was reloaded).
+        
+        Args:
+            query: User query string
+            embedding: Query embedding if the caller already has one
+            
+        Returns:
+            Tuple of (retrieved documents, query embedding or None when the
+            plain retriever was used)
+        """
+        service = self.rag_chain.retriever_service
+        if RAG_RETRIEVAL_CACHE_SIZE <= 0 or service is None or service.vector_store is None:
+            return self.rag_chain.retriever.invoke(query), embedding
+        
+        if embedding is None:
+            embedding = service.embed_query(query)
+        key = embedding_key(embedding)
+        
+        with self._retrieval_lock:
+            entry = self._retrieval_cache.get(key)
+            if entry is not None and entry[0] == service.kb_version:
+                self._retrieval_cache.move_to_end(key)
+                return list(entry[1]), embedding
+        
+        docs = service.retrieve_by_vector(embedding)
+        
+        with self._retrieval_lock:
+            self._retrieval_cache[key] = (service.kb_version, docs)
+            self._retrieval_cache.move_to_end(key)
+            if len(self._retrieval_cache) > RAG_RETRIEVAL_CACHE_SIZE:
+                self._retrieval_cache.popitem(last=False)
+        return list(docs), embedding
     
-    def generate_response(self, query: str) -> Dict[str, Any]:
+    def _build_result(self, response: str, retrieved_docs: List[Any]) -> Dict[str, Any]:
+        """
+        Package a response and its source documents for the state
+        
+        Args:
+            response: Generated response text
+            retrieved_docs: Documents the response was grounded on
+            
+        Returns:
+            Dict containing response and formatted documents
+        """
+        # References into the shared chunk store, not copies of the text
+        formatted_docs = [
+            DocRef(i, store_chunk(doc.page_content, doc.metadata))
+            for i, doc in enumerate(retrieved_docs, 1)
+        ]
+        
+        return {
+            'response': response,
+            'retrieved_documents': formatted_docs,
+            'document_count': len(formatted_docs)
+        }
+    
+    def _error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        """Log a generation failure and return the fallback result"""
+        logger.exception("RAG generation failed for query=%r", query)
+        return {
+            'response': _FALLBACK_ERROR_MSG,
+            'retrieved_documents': [],
+            'document_count': 0,
+            'error': str(error)
+        }
+    
+    def generate_response(self, query: str, embedding: Optional[Sequence[float]] = None) -> Dict[str, Any]:
         """
         Generate response using RAG chain
         
+        Repeated queries (same text up to case and whitespace) are served
+        from an in-memory LRU without retrieval or generation, until the
+        entry expires or the knowledge base is reloaded.
+        
         Args:
             query: User query string
+            embedding: Query embedding if already computed upstream
             
         Returns:
             Dict containing response and retrieved documents
         """
+        key = normalize_query(query)
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.debug("⚡ RAG node cache hit: %s", key)
+            return cached
+        
         try:
-            print(f"\n{'='*70}")
-            print(f"🔍 Generating RAG Response")
-            print(f"{'='*70}")
-            print(f"Query: {query}")
-            
-            # Retrieve documents first (before generating response)
-            retrieved_docs = self.rag_chain.retriever.invoke(query)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("🔍 Generating RAG response for: %s", query)
             
-            print(f"\n✅ Retrieved {len(retrieved_docs)} documents")
+            # Retrieve documents once and generate from them directly
+            retrieved_docs, embedding = self.retrieve(query, embedding)
+            response = self.rag_chain.query_with_docs(query, retrieved_docs, query_embedding=embedding)
             
-            # Query the RAG chain (returns string response)
-            response = self.rag_chain.query(query, verbose=False)
+            if debug:
+                logger.debug("✅ Response generated (%d documents, %d characters)", len(retrieved_docs), len(response))
             
-            print(f"\n✅ Response generated successfully!")
-            print(f"   Retrieved {len(retrieved_docs)} documents")
-            print(f"   Response length: {len(response)} characters")
-            
-            # Format retrieved documents for state
-            formatted_docs = []
-            for i, doc in enumerate(retrieved_docs, 1):
-                formatted_docs.append({
-                    'rank': i,
-                    'content': doc.page_content,
-                    'metadata': doc.metadata,
-                    'source': doc.metadata.get('source', 'unknown')
-                })
-            
-            return {
-                'response': response,
-                'retrieved_documents': formatted_docs,
-                'document_count': len(formatted_docs)
-            }
+            result = self._build_result(response, retrieved_docs)
+            self._cache_put(key, result)
+            return dict(result)
             
         except Exception as e:
-            print(f"\n❌ Error generating response: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                'response': f"I apologize, but I encountered an error processing your request. Please try again or contact our support team.",
-                'retrieved_documents': [],
-                'document_count': 0,
-                'error': str(e)
-            }
+            return self._error_result(query, e)
+    
+    def generate_responses(
+        self,
+        queries: List[str],
+        embeddings: Optional[List[Optional[Sequence[float]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate responses for several queries concurrently
+        
+        Cached queries are answered from the LRU; the rest are retrieved
+        (through the retrieval cache) and generated on the shared batch
+        pool, at most ``RAG_BATCH_MAX_WORKERS`` at a time.
+        
+        Args:
+            queries: User query strings
+            embeddings: Per-query embeddings already computed upstream
+                (entries may be None)
+            
+        Returns:
+            List of result dicts, in the same order as ``queries``
+        """
+        keys = [normalize_query(query) for query in queries]
+        results: List[Optional[Dict[str, Any]]] = [self._cache_get(key) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        def answer(i: int) -> Dict[str, Any]:
+            try:
+                retrieved_docs, embedding = self.retrieve(queries[i], embeddings[i] if embeddings else None)
+                response = self.rag_chain.query_with_docs(queries[i], retrieved_docs, query_embedding=embedding)
+            except Exception as e:
+                return self._error_result(queries[i], e)
+            result = self._build_result(response, retrieved_docs)
+            self._cache_put(keys[i], result)
+            return dict(result)
+        
+        for i, result in zip(pending, _BATCH_EXECUTOR.map(answer, pending)):
+            results[i] = result
+        return results
     
     def process(self, state: ChatbotState) -> ChatbotState:
         """
@@ -140,54 +329,80 @@ class RAGResponseNode:
         Returns:
             Updated chatbot state with response
         """
-        print(f"\n{'='*70}")
-        print(f"📊 RAG Node Processing")
-        print(f"{'='*70}")
+        # Not a RAG category - return state unchanged for other nodes
+        category = state.get('classified_category') or ''
+        if category not in RAG_CATEGORIES:
+            return state
         
-        # Extract query and category
         query = state.get('user_query', '')
-        category = state.get('classified_category', '')
-        confidence = state.get('confidence_score', 0.0)
+        confidence = state.get('confidence_score') or 0.0
         
-        print(f"User Query: {query}")
-        print(f"Category: {category}")
-        print(f"Confidence: {confidence:.2f}")
-        
-        # Check if RAG should be used
-        if not self.should_use_rag(category):
-            print(f"\n⚠️  RAG not applicable for category: {category}")
-            print(f"   This query should be handled by another node")
-            
-            # Return state unchanged - let other nodes handle it
-            return state
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("📊 RAG node processing")
+            logger.debug("User Query: %s | Category: %s | Confidence: %.2f", query, category, confidence)
         
         # Generate response using RAG
-        print(f"\n🚀 Using RAG chain to generate response...")
-        result = self.generate_response(query)
+        result = self.generate_response(query, dequantize_embedding(state.get('query_embedding')))
         
         # Update state with response and documents
-        updated_state = update_state(
+        updated_state = self._apply_result(state, result)
+        
+        if debug:
+            logger.debug("✅ State updated with RAG response (%d documents)", result['document_count'])
+            logger.debug("   Response preview: %s...", result['response'][:100])
+        
+        return updated_state
+    
+    def process_batch(self, states: List[ChatbotState]) -> List[ChatbotState]:
+        """
+        Process several states, generating their responses concurrently
+        
+        States outside the RAG categories are returned unchanged.
+        
+        Args:
+            states: Current chatbot states
+            
+        Returns:
+            Updated chatbot states, in the same order as ``states``
+        """
+        rag_indices = [
+            i for i, state in enumerate(states)
+            if (state.get('classified_category') or '') in RAG_CATEGORIES
+        ]
+        results = list(states)
+        if not rag_indices:
+            return results
+        
+        responses = self.generate_responses(
+            [states[i].get('user_query', '') for i in rag_indices],
+            [dequantize_embedding(states[i].get('query_embedding')) for i in rag_indices]
+        )
+        for i, result in zip(rag_indices, responses):
+            results[i] = self._apply_result(states[i], result)
+        
+        logger.debug("✅ RAG batch processed (%d of %d states)", len(rag_indices), len(states))
+        return results
+    
+    @staticmethod
+    def _apply_result(state: ChatbotState, result: Dict[str, Any]) -> ChatbotState:
+        """Copy a generation result onto the state"""
+        return update_state(
             state,
             final_response=result['response'],
             retrieved_documents=result['retrieved_documents'],
-            metadata={
-                **(state.get('metadata', {}) or {}),
+            metadata_patch={
                 'rag_used': True,
                 'document_count': result['document_count'],
                 'response_source': 'rag_chain',
                 'error': result.get('error', None)
             }
         )
-        
-        print(f"\n✅ State updated with RAG response")
-        print(f"   Documents retrieved: {result['document_count']}")
-        print(f"   Response preview: {result['response'][:100]}...")
-        
-        return updated_state
 
 
 # Global RAG node instance (singleton pattern)
 _rag_node_instance = None
+_rag_node_lock = threading.Lock()
 
 
 def get_rag_node() -> RAGResponseNode:
@@ -199,7 +414,10 @@ def get_rag_node() -> RAGResponseNode:
     """
     global _rag_node_instance
     if _rag_node_instance is None:
-        _rag_node_instance = RAGResponseNode()
+        # Startup preload and the first requests may race to build the node
+        with _rag_node_lock:
+            if _rag_node_instance is None:
+                _rag_node_instance = RAGResponseNode()
     return _rag_node_instance
 
 
@@ -234,15 +452,32 @@ def rag_response_node(state: ChatbotState) -> ChatbotState:
     return rag_node.process(state)
 
 
+def rag_response_node_batch(states: List[ChatbotState]) -> List[ChatbotState]:
+    """
+    Batched counterpart of ``rag_response_node``
+    
+    Retrieval and generation for all RAG-category states run concurrently
+    in one thread pool.
+    
+    Args:
+        states: Classified chatbot states
+        
+    Returns:
+        Updated chatbot states, in the same order as ``states``
+    """
+    return get_rag_node().process_batch(states)
+
+
 # =============================================================================
 # TESTING FUNCTIONS
 # =============================================================================
 
 def test_rag_node_basic():
     """Test RAG node with basic queries"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TESTING RAG NODE - Basic Queries")
-    print(f"{'='*70}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug(_TOP)
+    logger.debug("🧪 TESTING RAG NODE - Basic Queries")
+    logger.debug(_BAR)
     
     from graph.state import create_initial_state
     from graph.classifier_node import classifier_node
@@ -255,33 +490,31 @@ def test_rag_node_basic():
         "Is the power bank waterproof?"
     ]
     
-    for i, query in enumerate(test_queries, 1):
-        print(f"\n{'-'*70}")
-        print(f"Test {i}/{len(test_queries)}: {query}")
-        print(f"{'-'*70}")
-        
-        # Create initial state
-        state = create_initial_state(query)
-        
-        # Classify query
-        state = classifier_node(state)
-        
-        # Generate RAG response
-        state = rag_response_node(state)
+    # Classify every query, then generate all RAG responses in one batch
+    states = rag_response_node_batch([classifier_node(create_initial_state(query)) for query in test_queries])
+    
+    if not debug:
+        return
+    
+    for i, (query, state) in enumerate(zip(test_queries, states), 1):
+        logger.debug(_DIV_TOP)
+        logger.debug("Test %d/%d: %s", i, len(test_queries), query)
+        logger.debug(_DIV)
         
         # Display results
-        print(f"\n📊 Results:")
-        print(f"   Category: {state['classified_category']}")
-        print(f"   Confidence: {state.get('confidence_score', 0):.2f}")
-        print(f"   Documents: {len(state.get('retrieved_documents', []))}")
-        print(f"   Response: {state.get('final_response', 'No response')[:200]}...")
+        logger.debug("\n📊 Results:")
+        logger.debug("   Category: %s", state['classified_category'])
+        logger.debug("   Confidence: %.2f", state.get('confidence_score') or 0)
+        logger.debug("   Documents: %d", len(state.get('retrieved_documents') or []))
+        logger.debug("   Response: %s...", (state.get('final_response') or 'No response')[:200])
 
 
 def test_rag_node_categories():
     """Test RAG node with different categories"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TESTING RAG NODE - Category Handling")
-    print(f"{'='*70}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug(_TOP)
+    logger.debug("🧪 TESTING RAG NODE - Category Handling")
+    logger.debug(_BAR)
     
     from graph.state import create_initial_state
     
@@ -292,40 +525,52 @@ def test_rag_node_categories():
         ("What are your support hours?", "general"),
     ]
     
-    for i, (query, expected_category) in enumerate(test_cases, 1):
-        print(f"\n{'-'*70}")
-        print(f"Test {i}/{len(test_cases)}")
-        print(f"{'-'*70}")
-        print(f"Query: {query}")
-        print(f"Expected Category: {expected_category}")
-        
-        # Create state with pre-classified category
+    # Create states with pre-classified categories
+    states = []
+    for query, expected_category in test_cases:
         state = create_initial_state(query)
         state['classified_category'] = expected_category
         state['confidence_score'] = 1.0
-        
-        # Generate RAG response
-        state = rag_response_node(state)
+        states.append(state)
+    
+    # Generate RAG responses (non-RAG categories pass through unchanged)
+    states = rag_response_node_batch(states)
+    
+    if not debug:
+        return
+    
+    for i, ((query, expected_category), state) in enumerate(zip(test_cases, states), 1):
+        logger.debug(_DIV_TOP)
+        logger.debug("Test %d/%d", i, len(test_cases))
+        logger.debug(_DIV)
+        logger.debug("Query: %s", query)
+        logger.debug("Expected Category: %s", expected_category)
         
         # Check if RAG was used
         rag_used = state.get('metadata', {}).get('rag_used', False)
         
-        print(f"\n📊 Results:")
-        print(f"   RAG Used: {'✅ Yes' if rag_used else '❌ No'}")
-        print(f"   Category: {state['classified_category']}")
+        logger.debug("\n📊 Results:")
+        logger.debug("   RAG Used: %s", '✅ Yes' if rag_used else '❌ No')
+        logger.debug("   Category: %s", state['classified_category'])
         
         if rag_used:
-            print(f"   Documents: {len(state.get('retrieved_documents', []))}")
-            print(f"   Response: {state.get('final_response', '')[:150]}...")
+            logger.debug("   Documents: %d", len(state.get('retrieved_documents') or []))
+            logger.debug("   Response: %s...", (state.get('final_response') or '')[:150])
         else:
-            print(f"   Note: This category should be handled by another node")
+            logger.debug("   Note: This category should be handled by another node")
 
 
-def test_full_pipeline():
-    """Test complete pipeline: classification + RAG response"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TESTING FULL PIPELINE - Classification → RAG")
-    print(f"{'='*70}")
+def test_full_pipeline(stream: bool = False):
+    """
+    Test complete pipeline: classification + RAG response
+    
+    Args:
+        stream: Also stream each answer token by token (printed as it arrives)
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug(_TOP)
+    logger.debug("🧪 TESTING FULL PIPELINE - Classification → RAG")
+    logger.debug(_BAR)
     
     from graph.state import create_initial_state
     from graph.classifier_node import classifier_node
@@ -340,57 +585,80 @@ def test_full_pipeline():
     success_count = 0
     total_queries = len(product_queries)
     
-    for i, query in enumerate(product_queries, 1):
-        print(f"\n{'-'*70}")
-        print(f"Pipeline Test {i}/{total_queries}")
-        print(f"{'-'*70}")
-        print(f"Query: {query}")
+    try:
+        # Step 1: Create initial states
+        states = [create_initial_state(query) for query in product_queries]
+        logger.debug("\n✅ Step 1: %d initial states created", total_queries)
         
-        try:
-            # Step 1: Create initial state
-            state = create_initial_state(query)
-            print(f"\n✅ Step 1: Initial state created")
-            
-            # Step 2: Classify query
-            state = classifier_node(state)
-            print(f"✅ Step 2: Query classified as '{state['classified_category']}'")
-            
-            # Step 3: Generate RAG response
-            state = rag_response_node(state)
-            print(f"✅ Step 3: RAG response generated")
-            
-            # Verify response
-            has_response = bool(state.get('final_response'))
-            has_docs = len(state.get('retrieved_documents', [])) > 0
-            
-            if has_response and has_docs:
-                success_count += 1
-                print(f"\n✅ PIPELINE SUCCESS")
-                print(f"   Category: {state['classified_category']}")
-                print(f"   Documents: {len(state['retrieved_documents'])}")
-                print(f"   Response: {state['final_response'][:200]}...")
-            else:
-                print(f"\n⚠️  INCOMPLETE RESPONSE")
-                print(f"   Has Response: {has_response}")
-                print(f"   Has Documents: {has_docs}")
-                
-        except Exception as e:
-            print(f"\n❌ PIPELINE ERROR: {str(e)}")
+        # Step 2: Classify queries
+        states = [classifier_node(state) for state in states]
+        logger.debug("✅ Step 2: Queries classified")
+        
+        # Step 3: Generate RAG responses in one batch
+        states = rag_response_node_batch(states)
+        logger.debug("✅ Step 3: RAG responses generated")
+    except Exception as e:
+        logger.error("\n❌ PIPELINE ERROR: %s", e)
+        states = []
+    
+    for i, (query, state) in enumerate(zip(product_queries, states), 1):
+        # Verify response
+        has_response = bool(state.get('final_response'))
+        has_docs = len(state.get('retrieved_documents') or []) > 0
+        if has_response and has_docs:
+            success_count += 1
+        
+        if not debug:
+            continue
+        
+        logger.debug(_DIV_TOP)
+        logger.debug("Pipeline Test %d/%d", i, total_queries)
+        logger.debug(_DIV)
+        logger.debug("Query: %s", query)
+        logger.debug("Category: '%s'", state['classified_category'])
+        
+        if has_response and has_docs:
+            logger.debug("\n✅ PIPELINE SUCCESS")
+            logger.debug("   Category: %s", state['classified_category'])
+            logger.debug("   Documents: %d", len(state['retrieved_documents']))
+            logger.debug("   Response: %s...", state['final_response'][:200])
+        else:
+            logger.debug("\n⚠️  INCOMPLETE RESPONSE")
+            logger.debug("   Has Response: %s", has_response)
+            logger.debug("   Has Documents: %s", has_docs)
+    
+    if stream:
+        import asyncio
+        
+        async def stream_all():
+            rag_chain = get_rag_node().rag_chain
+            for query in product_queries:
+                print(f"\n🔄 Streaming: {query}")
+                async for token in rag_chain.astream_query(query):
+                    print(token, end='', flush=True)
+                print()
+        
+        asyncio.run(stream_all())
     
     # Summary
-    print(f"\n{'='*70}")
-    print(f"📊 PIPELINE TEST SUMMARY")
-    print(f"{'='*70}")
-    print(f"Total Tests: {total_queries}")
-    print(f"Successful: {success_count}")
-    print(f"Success Rate: {(success_count/total_queries)*100:.1f}%")
+    logger.debug(_TOP)
+    logger.debug("📊 PIPELINE TEST SUMMARY")
+    logger.debug(_BAR)
+    logger.debug("Total Tests: %d", total_queries)
+    logger.debug("Successful: %d", success_count)
+    logger.debug("Success Rate: %.1f%%", (success_count/total_queries)*100)
 
 
 if __name__ == "__main__":
     """Run tests when script is executed directly"""
-    print(f"\n{'#'*70}")
+    # Test output goes through this module's logger; CHATBOT_TEST_QUIET=true
+    # silences it (debug calls then cost a single level check)
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.WARNING if CHATBOT_TEST_QUIET else logging.DEBUG)
+    
+    print(_HASH_TOP)
     print(f"#  RAG RESPONSE NODE - COMPREHENSIVE TESTING")
-    print(f"{'#'*70}")
+    print(_HASH)
     
     try:
         # Test 1: Basic RAG node functionality
@@ -402,14 +670,14 @@ if __name__ == "__main__":
         # Test 3: Full pipeline
         test_full_pipeline()
         
-        print(f"\n{'='*70}")
+        print(_TOP)
         print(f"✅ ALL TESTS COMPLETED SUCCESSFULLY!")
-        print(f"{'='*70}")
+        print(_BAR)
         
     except Exception as e:
-        print(f"\n{'='*70}")
+        print(_TOP)
         print(f"❌ TEST EXECUTION FAILED")
-        print(f"{'='*70}")
+        print(_BAR)
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
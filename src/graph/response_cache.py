@@ -0,0 +1,206 @@
+"""
+Response Cache
+Two-tier cache of finished workflow results, consulted before the graph runs
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph.rag_node import normalize_query
+from graph.state import ChatbotState, dequantize_embedding, quantize_embedding, update_state_inplace
+from services.semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+# Workflow response cache configuration
+WORKFLOW_CACHE_ENABLED = os.getenv("WORKFLOW_CACHE_ENABLED", "true").lower() == "true"
+WORKFLOW_CACHE_SIZE = int(os.getenv("WORKFLOW_CACHE_SIZE", "1000"))
+WORKFLOW_CACHE_SEMANTIC = os.getenv("WORKFLOW_CACHE_SEMANTIC", "true").lower() == "true"
+WORKFLOW_CACHE_THRESHOLD = float(os.getenv("WORKFLOW_CACHE_THRESHOLD", "0.95"))
+# LSH bucketing for the semantic tier (0 = exact search). A single table
+# with exact signature match misses many near-duplicates above the
+# threshold, so exact search is the default at these cache sizes
+WORKFLOW_CACHE_LSH_BITS = int(os.getenv("WORKFLOW_CACHE_LSH_BITS", "0"))
+WORKFLOW_CACHE_TTL = float(os.getenv("WORKFLOW_CACHE_TTL", "300"))
+
+# State fields copied from a cached result onto the current query's state.
+# The classification is not among them - a hit keeps the fresh one
+CACHED_FIELDS = (
+    'final_response',
+    'retrieved_documents',
+    'needs_escalation',
+)
+
+# Metadata keys of the answering node kept with a cached result
+CACHED_METADATA = (
+    'rag_used',
+    'document_count',
+    'response_source',
+)
+
+
+def apply_cached(state: ChatbotState, cached: Dict[str, Any]) -> ChatbotState:
+    """
+    Copy a cached result onto a state the caller owns
+    
+    Args:
+        state: The current query's (classified) state
+        cached: Result from ``ResponseCache.get``
+        
+    Returns:
+        The same state, answered and marked ``metadata['cache_hit']``
+    """
+    fields = dict(cached)
+    metadata = fields.pop('metadata', None) or {}
+    return update_state_inplace(state, metadata_patch={**metadata, 'cache_hit': True}, **fields)
+
+
+class ResponseCache:
+    """
+    Cache of workflow results keyed by user query
+
+    Tiers:
+        - exact: LRU dict keyed by the normalized query text
+        - semantic: optional ``SemanticCache`` over query embeddings, for
+          near-duplicate phrasings (only consulted on an exact miss)
+    
+    Entries in both tiers expire ``ttl_seconds`` after they were stored.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        tau: float = 0.95,
+        lsh_bits: Optional[int] = None,
+        ttl_seconds: Optional[float] = 300
+    ):
+        """
+        Initialize ResponseCache
+
+        Args:
+            max_size: Maximum entries per tier (least recently used evicted first)
+            embed_fn: Query embedding function (None = exact tier only)
+            tau: Minimum cosine similarity for a semantic hit
+            lsh_bits: LSH hyperplanes for the semantic tier (None = exact search)
+            ttl_seconds: Entry lifetime in seconds (None = never expire)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # normalized query -> (result fields, stored_at)
+        self._exact: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.semantic = SemanticCache(
+            embed_fn,
+            tau=tau,
+            max_size=max_size,
+            ttl_seconds=ttl_seconds,
+            lsh_bits=lsh_bits
+        ) if embed_fn is not None else None
+
+    def _put_exact(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._exact[key] = (entry, time.monotonic())
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_size:
+                self._exact.popitem(last=False)
+
+    def _embedding(self, query: str, state: Optional[ChatbotState]):
+        """Query embedding carried by the state, else freshly computed"""
+        data = state.get('query_embedding') if state is not None else None
+        return dequantize_embedding(data) if data else self.semantic.embed_fn(query)
+
+    def get(self, query: str, state: Optional[ChatbotState] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached result fields for a query
+
+        Args:
+            query: User query
+            state: The caller's initial state for this query; when the
+                semantic tier embeds the query, the embedding is stored in
+                ``state['query_embedding']`` for the nodes to reuse
+
+        Returns:
+            Dict of ``CACHED_FIELDS`` values plus the cached ``metadata``
+            (see ``apply_cached``), or None on a miss
+        """
+        key = normalize_query(query)
+        with self._lock:
+            cached = self._exact.get(key)
+            if cached is not None:
+                entry, stored_at = cached
+                if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                    del self._exact[key]
+                else:
+                    self._exact.move_to_end(key)
+                    return dict(entry)
+
+        if self.semantic is None:
+            return None
+
+        try:
+            embedding = self._embedding(query, state)
+            if state is not None and not state.get('query_embedding'):
+                state['query_embedding'] = quantize_embedding(embedding)
+            entry = self.semantic.lookup_vector(self.semantic.normalize(embedding))
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed: %s", e)
+            return None
+        if entry is None:
+            return None
+        # Promote so the next identical query skips the embedding call
+        self._put_exact(key, entry)
+        return dict(entry)
+
+    def put(self, query: str, state: ChatbotState):
+        """
+        Cache the result fields of a finished workflow state
+
+        Failed runs (``metadata['error']`` set) are not cached. The state's
+        ``query_embedding`` is reused for the semantic tier when present.
+
+        Args:
+            query: User query
+            state: Final workflow state
+        """
+        if (state.get('metadata') or {}).get('error') or not state.get('final_response'):
+            return
+        entry = {field: state.get(field) for field in CACHED_FIELDS}
+        metadata = state.get('metadata') or {}
+        entry['metadata'] = {key: metadata[key] for key in CACHED_METADATA if key in metadata}
+        self._put_exact(normalize_query(query), entry)
+        if self.semantic is not None:
+            try:
+                vector = self.semantic.normalize(self._embedding(query, state))
+                self.semantic.insert_vector(vector, entry)
+            except Exception as e:
+                logger.warning("Semantic cache insert failed: %s", e)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._exact.clear()
+        if self.semantic is not None:
+            self.semantic.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with exact-tier size and semantic-tier stats
+        """
+        return {
+            "exact_size": len(self._exact),
+            "max_size": self.max_size,
+            "semantic": self.semantic.stats() if self.semantic is not None else None,
+        }
@@ -3,9 +3,99 @@ LangGraph State Schema
 Defines the state structure for the chatbot workflow
 """
 
-from typing import TypedDict, Optional, List, Dict, Any
+import base64
+import os
+import sys
+import threading
+import uuid
+from typing import NamedTuple, TypedDict, Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
+import numpy as np
+import orjson
+
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__all__ = [
+    "DocRef",
+    "store_chunk",
+    "ChatbotState",
+    "PRODUCT_INQUIRY",
+    "POLICY_INQUIRY",
+    "SUPPORT_INQUIRY",
+    "GENERAL_INQUIRY",
+    "ESCALATE",
+    "OUT_OF_SCOPE",
+    "RAG_CATEGORIES",
+    "ROUTE_TABLE",
+    "QUERY_CATEGORIES",
+    "create_initial_state",
+    "create_initial_states",
+    "quantize_embedding",
+    "dequantize_embedding",
+    "update_state",
+    "update_state_inplace",
+    "get_category_description",
+    "get_category_examples",
+    "validate_state",
+    "dumps_state",
+    "loads_state",
+]
+
+
+# Knowledge-base chunks referenced by states: chunk_id -> (text, metadata).
+# Each distinct chunk is stored once, however many states and cache entries
+# point at it; bounded by the size of the knowledge base.
+_CHUNK_STORE: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+_CHUNK_IDS: Dict[Tuple[str, Optional[str]], int] = {}
+_chunk_lock = threading.Lock()
+
+
+def store_chunk(content: str, metadata: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Register a chunk in the shared chunk store
+    
+    Args:
+        content: Chunk text
+        metadata: Chunk metadata (``source`` etc.)
+        
+    Returns:
+        Chunk id; the same text and source always map to the same id
+    """
+    metadata = metadata or {}
+    key = (content, metadata.get("source"))
+    chunk_id = _CHUNK_IDS.get(key)
+    if chunk_id is None:
+        with _chunk_lock:
+            chunk_id = _CHUNK_IDS.get(key)
+            if chunk_id is None:
+                chunk_id = len(_CHUNK_STORE)
+                _CHUNK_STORE[chunk_id] = (content, metadata)
+                _CHUNK_IDS[key] = chunk_id
+    return chunk_id
+
+
+class DocRef(NamedTuple):
+    """A retrieved knowledge-base chunk as stored in the state"""
+    
+    rank: int
+    """1-based retrieval rank"""
+    
+    chunk_id: int
+    """Id of the chunk in the shared chunk store (see ``store_chunk``)"""
+    
+    @property
+    def content(self) -> str:
+        """Chunk text"""
+        return _CHUNK_STORE[self.chunk_id][0]
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Chunk metadata (``source`` etc.)"""
+        return _CHUNK_STORE[self.chunk_id][1]
+
 
 class ChatbotState(TypedDict, total=False):
     """
@@ -32,12 +122,15 @@ class ChatbotState(TypedDict, total=False):
     - 'out_of_scope': Questions outside the knowledge base
     """
     
+    _next_node: Optional[str]
+    """Node the workflow routes to next ("rag" or "escalation"), set by the classifier"""
+    
     # Response Generation
     final_response: Optional[str]
     """The final response generated for the user"""
     
     # Additional Context (optional fields)
-    retrieved_documents: Optional[List[Dict[str, Any]]]
+    retrieved_documents: Optional[List[DocRef]]
     """Documents retrieved from the vector store for context"""
     
     confidence_score: Optional[float]
@@ -53,12 +146,34 @@ class ChatbotState(TypedDict, total=False):
     """Timestamp when the query was received"""
     
     metadata: Optional[Dict[str, Any]]
-    """Additional metadata for logging and analytics"""
+    """
+    Additional metadata for logging and analytics (absent until a node
+    first writes it - read with ``state.get('metadata', {})``)
+    """
+    
+    query_embedding: Optional[bytes]
+    """
+    Query embedding as int8 codes plus scale (see ``quantize_embedding``),
+    set by the first step that embeds the query so later steps reuse it
+    """
+
 
+# Category names, interned once so every module compares the same objects
+PRODUCT_INQUIRY = sys.intern("product_inquiry")
+POLICY_INQUIRY = sys.intern("policy_inquiry")
+SUPPORT_INQUIRY = sys.intern("support_inquiry")
+GENERAL_INQUIRY = sys.intern("general_inquiry")
+ESCALATE = sys.intern("escalate")
+OUT_OF_SCOPE = sys.intern("out_of_scope")
+
+# Categories answered from the knowledge base by the RAG node; the workflow
+# routes everything else to escalation
+RAG_CATEGORIES = frozenset(("product", "general", PRODUCT_INQUIRY, GENERAL_INQUIRY))
+ROUTE_TABLE = {category: "rag" for category in RAG_CATEGORIES}
 
 # Category definitions
 QUERY_CATEGORIES = {
-    "product_inquiry": {
+    PRODUCT_INQUIRY: {
         "description": "Questions about products, prices, features, specifications",
         "examples": [
             "What is the price of SmartWatch Pro X?",
@@ -66,7 +181,7 @@ QUERY_CATEGORIES = {
             "Does the Power Bank support fast charging?"
         ]
     },
-    "policy_inquiry": {
+    POLICY_INQUIRY: {
         "description": "Questions about return, exchange, warranty, shipping policies",
         "examples": [
             "What is your return policy?",
@@ -74,7 +189,7 @@ QUERY_CATEGORIES = {
             "What is the warranty period?"
         ]
     },
-    "support_inquiry": {
+    SUPPORT_INQUIRY: {
         "description": "Questions about customer support, contact information, support hours",
         "examples": [
             "How can I contact customer support?",
@@ -82,7 +197,7 @@ QUERY_CATEGORIES = {
             "Can I chat with someone?"
         ]
     },
-    "general_inquiry": {
+    GENERAL_INQUIRY: {
         "description": "General questions that can be answered from knowledge base",
         "examples": [
             "Do you have payment on delivery?",
@@ -90,7 +205,7 @@ QUERY_CATEGORIES = {
             "How long does shipping take?"
         ]
     },
-    "escalate": {
+    ESCALATE: {
         "description": "Complex queries requiring human intervention",
         "examples": [
             "I want to file a complaint",
@@ -98,7 +213,7 @@ QUERY_CATEGORIES = {
             "This is not working properly"
         ]
     },
-    "out_of_scope": {
+    OUT_OF_SCOPE: {
         "description": "Questions outside the knowledge base or domain",
         "examples": [
             "What is the weather today?",
@@ -108,6 +223,11 @@ QUERY_CATEGORIES = {
     }
 }
 
+# Flat lookups derived from QUERY_CATEGORIES (fixed at import)
+_CAT_DESC = {category: info["description"] for category, info in QUERY_CATEGORIES.items()}
+_CAT_EXAMPLES = {category: tuple(info["examples"]) for category, info in QUERY_CATEGORIES.items()}
+_VALID_CATEGORIES = frozenset(QUERY_CATEGORIES)
+
 
 def create_initial_state(user_query: str, conversation_id: Optional[str] = None) -> ChatbotState:
     """
@@ -120,8 +240,6 @@ def create_initial_state(user_query: str, conversation_id: Optional[str] = None)
     Returns:
         ChatbotState with initialized fields
     """
-    import uuid
-    
     state: ChatbotState = {
         "user_query": user_query,
         "classified_category": None,
@@ -131,14 +249,86 @@ def create_initial_state(user_query: str, conversation_id: Optional[str] = None)
         "needs_escalation": False,
         "conversation_id": conversation_id or str(uuid.uuid4()),
         "timestamp": datetime.now().isoformat(),
-        "metadata": {}
+        "query_embedding": None
     }
     
     return state
 
 
+def create_initial_states(user_queries: List[str]) -> List[ChatbotState]:
+    """
+    Create initial states for a batch of user queries
+    
+    The batch shares one timestamp, and conversation IDs come from a single
+    ``os.urandom`` read instead of one ``uuid4()`` call per query.
+    
+    Args:
+        user_queries: The users' questions
+        
+    Returns:
+        List of ChatbotState, one per query
+    """
+    timestamp = datetime.now().isoformat()
+    random_bytes = os.urandom(16 * len(user_queries))
+    
+    return [
+        {
+            "user_query": user_query,
+            "classified_category": None,
+            "final_response": None,
+            "retrieved_documents": None,
+            "confidence_score": None,
+            "needs_escalation": False,
+            "conversation_id": str(uuid.UUID(bytes=random_bytes[16 * i:16 * (i + 1)], version=4)),
+            "timestamp": timestamp,
+            "query_embedding": None
+        }
+        for i, user_query in enumerate(user_queries)
+    ]
+
+
+def quantize_embedding(embedding) -> bytes:
+    """
+    Pack an embedding as int8 codes for the state
+    
+    Layout: float32 scale (4 bytes) followed by one int8 code per dimension,
+    about a quarter of the float32 size. ``quantize_int8`` scales each vector
+    by its largest component, so nothing is clipped and re-quantizing a
+    dequantized vector yields the same bytes.
+    
+    Args:
+        embedding: Query embedding (any float sequence)
+        
+    Returns:
+        Quantized embedding bytes
+    """
+    # Deferred: the services package pulls in langchain_core, which schema-only
+    # importers of this module should not pay for
+    from services.quantized_index import quantize_int8
+    
+    codes, scales = quantize_int8(np.asarray(embedding, dtype=np.float32).reshape(1, -1))
+    return scales.tobytes() + codes.tobytes()
+
+
+def dequantize_embedding(data: Optional[bytes]) -> Optional[np.ndarray]:
+    """
+    Unpack ``quantize_embedding`` bytes
+    
+    Args:
+        data: Quantized embedding bytes (or None)
+        
+    Returns:
+        Approximate float32 embedding, or None when no embedding is stored
+    """
+    if not data:
+        return None
+    scale = np.frombuffer(data, dtype=np.float32, count=1)[0]
+    return np.frombuffer(data, dtype=np.int8, offset=4).astype(np.float32) * scale
+
+
 def update_state(
     current_state: ChatbotState,
+    metadata_patch: Optional[Dict[str, Any]] = None,
     **updates
 ) -> ChatbotState:
     """
@@ -146,16 +336,46 @@ def update_state(
     
     Args:
         current_state: Current state dictionary
+        metadata_patch: Keys to merge into the existing metadata (the
+            input state's metadata dict is never mutated)
         **updates: Key-value pairs to update
         
     Returns:
         Updated ChatbotState
     """
-    updated_state = current_state.copy()
-    updated_state.update(updates)
+    updated_state = {**current_state, **updates}
+    if metadata_patch:
+        metadata = updated_state.get('metadata')
+        updated_state['metadata'] = {**metadata, **metadata_patch} if metadata else dict(metadata_patch)
     return updated_state
 
 
+def update_state_inplace(
+    state: ChatbotState,
+    metadata_patch: Optional[Dict[str, Any]] = None,
+    **updates
+) -> ChatbotState:
+    """
+    Update a state the caller owns without copying it
+    
+    Only use this on a state no one else holds a reference to (e.g. one
+    just returned by ``create_initial_state``); otherwise use ``update_state``.
+    
+    Args:
+        state: State dictionary to modify
+        metadata_patch: Keys to merge into the state's metadata
+        **updates: Key-value pairs to update
+        
+    Returns:
+        The same state object, updated
+    """
+    state.update(updates)
+    if metadata_patch:
+        metadata = state.get('metadata')
+        state['metadata'] = {**metadata, **metadata_patch} if metadata else dict(metadata_patch)
+    return state
+
+
 def get_category_description(category: str) -> str:
     """
     Get description for a category
@@ -166,10 +386,10 @@ def get_category_description(category: str) -> str:
     Returns:
         Category description
     """
-    return QUERY_CATEGORIES.get(category, {}).get("description", "Unknown category")
+    return _CAT_DESC.get(category, "Unknown category")
 
 
-def get_category_examples(category: str) -> List[str]:
+def get_category_examples(category: str) -> Tuple[str, ...]:
     """
     Get example queries for a category
     
@@ -177,9 +397,9 @@ def get_category_examples(category: str) -> List[str]:
         category: Category name
         
     Returns:
-        List of example queries
+        Tuple of example queries (empty for unknown categories)
     """
-    return QUERY_CATEGORIES.get(category, {}).get("examples", [])
+    return _CAT_EXAMPLES.get(category, ())
 
 
 def validate_state(state: ChatbotState) -> bool:
@@ -198,12 +418,56 @@ def validate_state(state: ChatbotState) -> bool:
     
     # Validate category if present
     if state.get("classified_category"):
-        if state["classified_category"] not in QUERY_CATEGORIES:
+        if state["classified_category"] not in _VALID_CATEGORIES:
             return False
     
     return True
 
 
+def _json_default(obj):
+    """orjson fallback for state values it cannot serialize natively"""
+    if isinstance(obj, DocRef):
+        # Chunk ids are process-local, so the chunk itself is written out
+        return {"rank": obj.rank, "content": obj.content, "metadata": obj.metadata}
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_state(state: ChatbotState) -> str:
+    """
+    Serialize a state to JSON (checkpointing, tracing, conversation logs)
+    
+    Args:
+        state: State to serialize
+        
+    Returns:
+        JSON string; ``loads_state`` restores it
+    """
+    return orjson.dumps(state, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def loads_state(data) -> ChatbotState:
+    """
+    Deserialize a state written by ``dumps_state``
+    
+    Args:
+        data: JSON string or bytes
+        
+    Returns:
+        State with ``DocRef`` documents and ``bytes`` query embedding restored
+    """
+    state = orjson.loads(data)
+    if state.get("retrieved_documents"):
+        state["retrieved_documents"] = [
+            DocRef(doc["rank"], store_chunk(doc["content"], doc["metadata"]))
+            for doc in state["retrieved_documents"]
+        ]
+    if state.get("query_embedding"):
+        state["query_embedding"] = base64.b64decode(state["query_embedding"])
+    return state
+
+
 # Example usage
 if __name__ == "__main__":
     print("="*70)
@@ -239,7 +503,7 @@ if __name__ == "__main__":
         state,
         final_response="The SmartWatch Pro X is priced at ₹15,999.",
         retrieved_documents=[
-            {"source": "product_info.txt", "content": "SmartWatch Pro X Price: ₹15,999"}
+            DocRef(1, store_chunk("SmartWatch Pro X Price: ₹15,999", {"source": "product_info.txt"}))
         ]
     )
     
@@ -3,155 +3,312 @@ LangGraph Workflow
 Complete chatbot workflow with conditional routing
 """
 
+import asyncio
 import os
 import sys
-from typing import Literal
-from langgraph.graph import StateGraph, END
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, List, Literal, Sequence, Tuple
 
 # Add parent directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, parent_dir)
 
-from graph.state import ChatbotState
-from graph.classifier_node import classifier_node
-from graph.rag_node import rag_response_node
-from graph.escalation_node import escalation_node
+from graph.state import ROUTE_TABLE, ChatbotState
+from graph.classifier_node import classifier_node, get_classifier
+from graph.rag_node import normalize_query, rag_response_node, rag_response_node_batch, get_rag_node
+from graph.escalation_node import escalation_node, get_escalation_handler
+from graph.response_cache import (
+    ResponseCache,
+    apply_cached,
+    WORKFLOW_CACHE_ENABLED,
+    WORKFLOW_CACHE_SIZE,
+    WORKFLOW_CACHE_SEMANTIC,
+    WORKFLOW_CACHE_THRESHOLD,
+    WORKFLOW_CACHE_LSH_BITS,
+    WORKFLOW_CACHE_TTL,
+)
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
-class ChatbotWorkflow:
+__all__ = [
+    "CHATBOT_VERBOSE",
+    "ChatbotWorkflow",
+    "get_workflow",
+    "preload",
+    "run_chatbot",
+]
+
+
+# Print graph construction and per-query routing details
+CHATBOT_VERBOSE = os.getenv("CHATBOT_VERBOSE", "false").lower() == "true"
+
+_WORKFLOW_DIAGRAM = """
+        User Query
+            ↓
+        ┌─────────────┐
+        │ Classifier  │ (Categorize query)
+        └─────────────┘
+            ↓
+            ├─→ [product/general] ─→ ┌─────────┐
+            │                         │   RAG   │ (Knowledge base)
+            │                         └─────────┘
+            │                              ↓
+            │                            [END]
+            │
+            └─→ [returns] ──────────→ ┌─────────────┐
+                                      │ Escalation  │ (Human support)
+                                      └─────────────┘
+                                           ↓
+                                         [END]
+        """
+
+_BAR = "=" * 70
+
+_WORKFLOW_STRUCTURE = "\n".join([
+    "",
+    "📊 Workflow Structure:",
+    _BAR,
+    _WORKFLOW_DIAGRAM,
+    _BAR,
+    "",
+])
+
+# Written in one call by a verbose ChatbotWorkflow() rather than line by line
+_WORKFLOW_BANNER = "\n".join([
+    "",
+    _BAR,
+    "🚀 Initializing Chatbot Workflow",
+    _BAR,
+    "",
+    _BAR,
+    "✅ Chatbot Workflow Initialized Successfully!",
+    _BAR,
+    _WORKFLOW_STRUCTURE,
+])
+
+
+def _route_query(state: ChatbotState) -> Literal["rag", "escalation"]:
     """
-    Complete LangGraph workflow for the customer support chatbot
+    Route queries based on classified category
     
-    Workflow:
-        User Query → Classifier → [product/general → RAG] or [returns → Escalation] → Response
+    Routing logic:
+        - product / product_inquiry → RAG (product information from knowledge base)
+        - general / general_inquiry → RAG (general info from knowledge base)
+        - returns and anything else → escalation (needs human support)
+    
+    The classifier stores the decision in ``_next_node``; the category
+    lookup only runs for states classified elsewhere.
+    
+    Args:
+        state: Current chatbot state
+        
+    Returns:
+        Next node name: "rag" or "escalation"
     """
+    route = state.get("_next_node") or ROUTE_TABLE.get(state.get("classified_category", "general"), "escalation")
+    if CHATBOT_VERBOSE:
+        target = "RAG" if route == "rag" else "Escalation"
+        print(f"   ➡️  Routing '{state.get('classified_category')}' → {target} node")
+    return route
+
+
+def _entry_route(state: ChatbotState) -> Literal["classifier", "rag", "escalation"]:
+    """
+    Pick the first node: states classified before the graph runs (the
+    response-cache path in ``ChatbotWorkflow.run``) skip the classifier
     
-    def __init__(self):
-        """Initialize the chatbot workflow"""
-        print(f"\n{'='*70}")
-        print(f"🚀 Initializing Chatbot Workflow")
-        print(f"{'='*70}")
+    Args:
+        state: Incoming chatbot state
         
-        # Create the state graph
-        self.workflow = StateGraph(ChatbotState)
+    Returns:
+        Node name: "classifier", or the ``_next_node`` already decided
+    """
+    return state.get("_next_node") or "classifier"
+
+
+def _add_nodes(workflow: "StateGraph", verbose: bool = CHATBOT_VERBOSE):
+    """Add all nodes to the workflow"""
+    # Classifier node
+    workflow.add_node("classifier", classifier_node)
+    
+    # RAG response node
+    workflow.add_node("rag", rag_response_node)
+    
+    # Escalation node
+    workflow.add_node("escalation", escalation_node)
+    
+    if verbose:
+        print(
+            f"   ✅ Added: classifier (query classification)\n"
+            f"   ✅ Added: rag (knowledge-based responses)\n"
+            f"   ✅ Added: escalation (human support handoff)"
+        )
+
+
+def _add_conditional_edges(workflow: "StateGraph", verbose: bool = CHATBOT_VERBOSE):
+    """Add conditional routing edges"""
+    workflow.add_conditional_edges(
+        "classifier",  # From classifier node
+        _route_query,  # Routing function
+        {
+            "rag": "rag",  # If route returns "rag", go to rag node
+            "escalation": "escalation"  # If route returns "escalation", go to escalation node
+        }
+    )
+    if verbose:
+        print(
+            f"   ✅ Conditional routing from classifier:\n"
+            f"      • product/general → rag\n"
+            f"      • returns → escalation"
+        )
+
+
+def _add_terminal_edges(workflow: "StateGraph", verbose: bool = CHATBOT_VERBOSE):
+    """Add edges to END node"""
+    from langgraph.graph import END
+    
+    workflow.add_edge("rag", END)
+    workflow.add_edge("escalation", END)
+    if verbose:
+        print(f"   ✅ rag → END\n   ✅ escalation → END")
+
+
+def _build_graph(verbose: bool = CHATBOT_VERBOSE):
+    """
+    Build and compile the workflow graph
+    
+    Args:
+        verbose: Print each construction step
         
-        # Add nodes to the graph
+    Returns:
+        Compiled LangGraph workflow
+    """
+    # LangGraph is imported on first build, not when this module is imported
+    from langgraph.graph import StateGraph
+    
+    # Create the state graph
+    workflow = StateGraph(ChatbotState)
+    
+    # Add nodes to the graph
+    if verbose:
         print(f"\n📊 Adding nodes to workflow:")
-        self._add_nodes()
-        
-        # Set entry point
-        print(f"\n🎯 Setting entry point: classifier")
-        self.workflow.set_entry_point("classifier")
-        
-        # Add conditional routing
+    _add_nodes(workflow, verbose)
+    
+    # Set entry point (already classified states go straight to their route)
+    if verbose:
+        print(f"\n🎯 Setting entry point: classifier (pre-classified states skip ahead)")
+    workflow.set_conditional_entry_point(
+        _entry_route,
+        {"classifier": "classifier", "rag": "rag", "escalation": "escalation"}
+    )
+    
+    # Add conditional routing
+    if verbose:
         print(f"\n🔀 Adding conditional routing:")
-        self._add_conditional_edges()
-        
-        # Add edges to END
+    _add_conditional_edges(workflow, verbose)
+    
+    # Add edges to END
+    if verbose:
         print(f"\n🏁 Adding terminal edges:")
-        self._add_terminal_edges()
-        
-        # Compile the graph
+    _add_terminal_edges(workflow, verbose)
+    
+    # Compile the graph
+    if verbose:
         print(f"\n⚙️  Compiling workflow graph...")
-        self.graph = self.workflow.compile()
-        
-        print(f"\n{'='*70}")
-        print(f"✅ Chatbot Workflow Initialized Successfully!")
-        print(f"{'='*70}")
-        
-        # Display workflow structure
-        self._display_workflow_structure()
+    return workflow.compile()
+
+
+# Compiled once, on the first ChatbotWorkflow(); every instance shares it (the
+# graph holds no per-instance state - nodes resolve their singletons lazily)
+_PRECOMPILED_GRAPH = None
+_graph_lock = threading.Lock()
+
+
+def _get_compiled_graph():
+    """
+    Get or compile the shared workflow graph
     
-    def _add_nodes(self):
-        """Add all nodes to the workflow"""
-        # Classifier node
-        self.workflow.add_node("classifier", classifier_node)
-        print(f"   ✅ Added: classifier (query classification)")
-        
-        # RAG response node
-        self.workflow.add_node("rag", rag_response_node)
-        print(f"   ✅ Added: rag (knowledge-based responses)")
+    Returns:
+        Compiled LangGraph workflow
+    """
+    global _PRECOMPILED_GRAPH
+    if _PRECOMPILED_GRAPH is None:
+        with _graph_lock:
+            if _PRECOMPILED_GRAPH is None:
+                _PRECOMPILED_GRAPH = _build_graph(verbose=False)
+    return _PRECOMPILED_GRAPH
+
+
+class ChatbotWorkflow:
+    """
+    Complete LangGraph workflow for the customer support chatbot
+    
+    Workflow:
+        User Query → Classifier → [product/general → RAG] or [returns → Escalation] → Response
+    """
+    
+    def __init__(self, verbose: bool = CHATBOT_VERBOSE):
+        """
+        Initialize the chatbot workflow
         
-        # Escalation node
-        self.workflow.add_node("escalation", escalation_node)
-        print(f"   ✅ Added: escalation (human support handoff)")
+        Args:
+            verbose: Print the initialization banner and workflow structure
+        """
+        # Reuse the shared compiled graph
+        self.graph = _get_compiled_graph()
+        
+        # Finished results for repeated / near-duplicate queries
+        self.response_cache = ResponseCache(
+            max_size=WORKFLOW_CACHE_SIZE,
+            embed_fn=self._embed_query if WORKFLOW_CACHE_SEMANTIC else None,
+            tau=WORKFLOW_CACHE_THRESHOLD,
+            lsh_bits=WORKFLOW_CACHE_LSH_BITS or None,
+            ttl_seconds=WORKFLOW_CACHE_TTL or None
+        ) if WORKFLOW_CACHE_ENABLED else None
+        
+        # Banner and workflow structure, precomputed at import
+        if verbose:
+            sys.stdout.write(_WORKFLOW_BANNER)
+    
+    _route_query = staticmethod(_route_query)
     
-    def _route_query(self, state: ChatbotState) -> Literal["rag", "escalation"]:
+    def _cache_lookup(self, user_query: str, initial_state: ChatbotState) -> Tuple[ChatbotState, bool]:
         """
-        Route queries based on classified category
+        Classify a query and serve it from the response cache when possible
+        
+        Escalations are templated, so they skip the lookup (and its
+        embedding call). The classified state carries ``_next_node``, so
+        when the graph runs on it the classifier is not run again.
         
         Args:
-            state: Current chatbot state
+            user_query: User's question
+            initial_state: Fresh state for the query
             
         Returns:
-            Next node name: "rag" or "escalation"
+            Tuple of (state, served): the answered state on a cache hit,
+            otherwise the classified state to run the graph on
         """
-        category = state.get("classified_category", "general")
-        
-        # Routing logic:
-        # - product → RAG (product information from knowledge base)
-        # - general → RAG (general info from knowledge base)
-        # - returns → escalation (needs human support)
-        
-        if category in ["product", "general"]:
-            print(f"   ➡️  Routing '{category}' → RAG node")
-            return "rag"
-        else:  # returns or other categories
-            print(f"   ➡️  Routing '{category}' → Escalation node")
-            return "escalation"
-    
-    def _add_conditional_edges(self):
-        """Add conditional routing edges"""
-        self.workflow.add_conditional_edges(
-            "classifier",  # From classifier node
-            self._route_query,  # Routing function
-            {
-                "rag": "rag",  # If route returns "rag", go to rag node
-                "escalation": "escalation"  # If route returns "escalation", go to escalation node
-            }
-        )
-        print(f"   ✅ Conditional routing from classifier:")
-        print(f"      • product/general → rag")
-        print(f"      • returns → escalation")
-    
-    def _add_terminal_edges(self):
-        """Add edges to END node"""
-        self.workflow.add_edge("rag", END)
-        print(f"   ✅ rag → END")
+        state = classifier_node(initial_state)
+        if state.get('_next_node') != "rag":
+            return state, False
         
-        self.workflow.add_edge("escalation", END)
-        print(f"   ✅ escalation → END")
-    
-    def _display_workflow_structure(self):
-        """Display the workflow structure"""
-        print(f"\n📊 Workflow Structure:")
-        print(f"{'='*70}")
-        print(f"""
-        User Query
-            ↓
-        ┌─────────────┐
-        │ Classifier  │ (Categorize query)
-        └─────────────┘
-            ↓
-            ├─→ [product/general] ─→ ┌─────────┐
-            │                         │   RAG   │ (Knowledge base)
-            │                         └─────────┘
-            │                              ↓
-            │                            [END]
-            │
-            └─→ [returns] ──────────→ ┌─────────────┐
-                                      │ Escalation  │ (Human support)
-                                      └─────────────┘
-                                           ↓
-                                         [END]
-        """)
-        print(f"{'='*70}")
+        # The lookup's query embedding lands on the state the RAG node reads
+        cached = self.response_cache.get(user_query, state)
+        if cached is None:
+            return state, False
+        # Served from the response cache - RAG and LLM skipped
+        return apply_cached(state, cached), True
     
     def run(self, user_query: str, verbose: bool = True) -> ChatbotState:
         """
         Run the workflow with a user query
         
+        With the response cache enabled, the query is classified first:
+        RAG-bound queries are served from the cache on a hit; misses and
+        escalations run the graph from the classified state.
+        
         Args:
             user_query: User's question
             verbose: Print execution details
@@ -170,8 +327,18 @@ class ChatbotWorkflow:
         # Create initial state
         initial_state = create_initial_state(user_query)
         
-        # Run the workflow
-        final_state = self.graph.invoke(initial_state)
+        if self.response_cache is None:
+            # Run the workflow
+            final_state = self.graph.invoke(initial_state)
+        else:
+            state, served = self._cache_lookup(user_query, initial_state)
+            if served:
+                final_state = state
+            else:
+                # Run the workflow (entry skips the classifier)
+                final_state = self.graph.invoke(state)
+                if state.get('_next_node') == "rag":
+                    self.response_cache.put(user_query, final_state)
         
         if verbose:
             print(f"\n{'='*70}")
@@ -187,6 +354,152 @@ class ChatbotWorkflow:
         
         return final_state
     
+    async def arun(self, user_query: str) -> ChatbotState:
+        """
+        Async counterpart of ``run`` (without console output)
+        
+        The graph runs with ``ainvoke``; LangGraph executes the synchronous
+        nodes in worker threads, so queries gathered on one event loop
+        overlap their embedding and LLM calls. Cache work, which may embed
+        the query, is kept off the loop the same way.
+        
+        Args:
+            user_query: User's question
+            
+        Returns:
+            Final chatbot state with response
+        """
+        from graph.state import create_initial_state
+        
+        initial_state = create_initial_state(user_query)
+        
+        if self.response_cache is None:
+            return await self.graph.ainvoke(initial_state)
+        
+        state, served = await asyncio.to_thread(self._cache_lookup, user_query, initial_state)
+        if served:
+            return state
+        final_state = await self.graph.ainvoke(state)
+        if state.get('_next_node') == "rag":
+            await asyncio.to_thread(self.response_cache.put, user_query, final_state)
+        return final_state
+    
+    def run_batch(self, user_queries: List[str]) -> List[ChatbotState]:
+        """
+        Run the workflow for several user queries in one batched call
+        
+        Duplicate queries (same text up to case and whitespace) are run
+        once and the result is shared. The remaining queries are classified
+        and partitioned by route: escalations are templated per query, the
+        RAG partition is checked against the response cache and the misses
+        are retrieved and generated concurrently in one batch.
+        
+        Args:
+            user_queries: List of user questions
+            
+        Returns:
+            List of final chatbot states, one per query (input order)
+        """
+        from graph.state import create_initial_states
+        
+        if not user_queries:
+            return []
+        
+        initial_states = create_initial_states(user_queries)
+        
+        # Index of the first occurrence of each normalized query
+        first_seen = {}
+        owners = [first_seen.setdefault(normalize_query(query), i) for i, query in enumerate(user_queries)]
+        
+        results: List[ChatbotState] = [None] * len(user_queries)
+        rag_batch, rag_indices = [], []
+        
+        for i in first_seen.values():
+            user_query, initial_state = user_queries[i], initial_states[i]
+            state = classifier_node(initial_state)
+            if self._route_query(state) != "rag":
+                # Templated - never worth a cache lookup
+                results[i] = escalation_node(state)
+                continue
+            
+            # The lookup's query embedding lands on the state the RAG node reads
+            cached = self.response_cache.get(user_query, state) if self.response_cache else None
+            if cached is not None:
+                results[i] = apply_cached(state, cached)
+            else:
+                rag_batch.append(state)
+                rag_indices.append(i)
+        
+        if rag_batch:
+            for i, final_state in zip(rag_indices, rag_response_node_batch(rag_batch)):
+                results[i] = final_state
+                if self.response_cache:
+                    self.response_cache.put(user_queries[i], final_state)
+        
+        # Duplicates share the result but keep their own query text and IDs
+        for i, owner in enumerate(owners):
+            if owner != i:
+                initial_state = initial_states[i]
+                results[i] = {
+                    **results[owner],
+                    'user_query': initial_state['user_query'],
+                    'conversation_id': initial_state['conversation_id'],
+                    'timestamp': initial_state['timestamp'],
+                }
+        return results
+    
+    def run_stream(self, user_query: str) -> Iterator[str]:
+        """
+        Run the workflow and yield the response incrementally
+        
+        The query is classified and routed exactly like ``run``. RAG answers
+        are streamed chunk by chunk from the LLM (or served whole from the
+        query cache); escalation responses are
+        templated and yielded as a single chunk.
+        
+        Args:
+            user_query: User's question
+            
+        Yields:
+            Response text chunks
+        """
+        from graph.state import create_initial_state
+        
+        state = classifier_node(create_initial_state(user_query))
+        
+        if self._route_query(state) == "rag":
+            yield from get_rag_node().rag_chain.stream_query(user_query)
+        else:
+            final_state = escalation_node(state)
+            yield final_state.get('final_response', '')
+    
+    async def arun_stream(self, user_query: str) -> AsyncIterator[str]:
+        """
+        Async counterpart of ``run_stream``
+        
+        RAG answers are streamed with ``RAGChain.astream_query``, so tokens
+        reach the caller as they are decoded without tying up a worker
+        thread for the whole generation.
+        
+        Args:
+            user_query: User's question
+            
+        Yields:
+            Response text chunks
+        """
+        from graph.state import create_initial_state
+        
+        state = classifier_node(create_initial_state(user_query))
+        
+        if self._route_query(state) == "rag":
+            # First call may build the RAG chain - keep that off the event loop
+            rag_node = await asyncio.to_thread(get_rag_node)
+            async for chunk in rag_node.rag_chain.astream_query(user_query):
+                yield chunk
+        else:
+            final_state = escalation_node(state)
+            yield final_state.get('final_response', '')
+    
     def get_graph(self):
         """
         Get the compiled graph object
@@ -196,24 +509,63 @@ class ChatbotWorkflow:
         """
         return self.graph
 
+    def get_embeddings(self):
+        """
+        Get the embedding model used by the knowledge base retriever
+
+        Returns:
+            Embeddings object exposing embed_query/embed_documents
+        """
+        rag_chain = get_rag_node().rag_chain
+        return rag_chain.retriever_service.vector_store_service.embeddings_function
+
+    def _embed_query(self, query: str) -> Sequence[float]:
+        """Embed a query with the knowledge base embedding model (memoized)"""
+        return get_rag_node().rag_chain.retriever_service.embed_query(query)
+
 
 # Global workflow instance (singleton)
 _workflow_instance = None
+_workflow_lock = threading.Lock()
 
 
 def get_workflow() -> ChatbotWorkflow:
     """
     Get or create workflow instance (singleton)
     
+    Uses double-checked locking: the lock is only taken while the instance
+    does not exist yet, so concurrent first calls build it exactly once.
+    
     Returns:
         ChatbotWorkflow instance
     """
     global _workflow_instance
     if _workflow_instance is None:
-        _workflow_instance = ChatbotWorkflow()
+        with _workflow_lock:
+            if _workflow_instance is None:
+                _workflow_instance = ChatbotWorkflow()
     return _workflow_instance
 
 
+def preload() -> ChatbotWorkflow:
+    """
+    Eagerly build the workflow and every node singleton
+    
+    Call once per process before serving traffic (e.g. from the server's
+    startup hook) so no request pays for LLM, retriever or chain setup.
+    Under a preforking server, calling it in the master before fork lets
+    workers share the loaded state copy-on-write.
+    
+    Returns:
+        The shared ChatbotWorkflow instance
+    """
+    workflow = get_workflow()
+    get_classifier()
+    get_escalation_handler()
+    get_rag_node()
+    return workflow
+
+
 def run_chatbot(user_query: str, verbose: bool = True) -> ChatbotState:
     """
     Convenience function to run the chatbot workflow
@@ -233,12 +585,8 @@ def run_chatbot(user_query: str, verbose: bool = True) -> ChatbotState:
 # TESTING FUNCTIONS
 # =============================================================================
 
-def test_workflow_product_query():
+async def test_workflow_product_query():
     """Test workflow with product queries"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TEST 1: Product Queries → RAG Node")
-    print(f"{'='*70}")
-    
     workflow = ChatbotWorkflow()
     
     test_queries = [
@@ -247,13 +595,18 @@ def test_workflow_product_query():
         "Does the power bank support fast charging?"
     ]
     
-    for i, query in enumerate(test_queries, 1):
+    # All queries in flight at once; printed after they complete
+    results = await asyncio.gather(*(workflow.arun(query) for query in test_queries))
+    
+    print(f"\n{'='*70}")
+    print(f"🧪 TEST 1: Product Queries → RAG Node")
+    print(f"{'='*70}")
+    
+    for i, (query, result) in enumerate(zip(test_queries, results), 1):
         print(f"\n{'-'*70}")
         print(f"Product Query {i}/{len(test_queries)}")
         print(f"{'-'*70}")
         
-        result = workflow.run(query, verbose=False)
-        
         print(f"Query: {query}")
         print(f"Category: {result['classified_category']}")
         print(f"Route: product → RAG")
@@ -271,12 +624,8 @@ def test_workflow_product_query():
     print(f"{'='*70}")
 
 
-def test_workflow_returns_query():
+async def test_workflow_returns_query():
     """Test workflow with returns queries"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TEST 2: Returns Queries → Escalation Node")
-    print(f"{'='*70}")
-    
     workflow = ChatbotWorkflow()
     
     test_queries = [
@@ -285,13 +634,18 @@ def test_workflow_returns_query():
         "Can I exchange my defective earbuds?"
     ]
     
-    for i, query in enumerate(test_queries, 1):
+    # All queries in flight at once; printed after they complete
+    results = await asyncio.gather(*(workflow.arun(query) for query in test_queries))
+    
+    print(f"\n{'='*70}")
+    print(f"🧪 TEST 2: Returns Queries → Escalation Node")
+    print(f"{'='*70}")
+    
+    for i, (query, result) in enumerate(zip(test_queries, results), 1):
         print(f"\n{'-'*70}")
         print(f"Returns Query {i}/{len(test_queries)}")
         print(f"{'-'*70}")
         
-        result = workflow.run(query, verbose=False)
-        
         print(f"Query: {query}")
         print(f"Category: {result['classified_category']}")
         print(f"Route: returns → Escalation")
@@ -310,12 +664,8 @@ def test_workflow_returns_query():
     print(f"{'='*70}")
 
 
-def test_workflow_general_query():
+async def test_workflow_general_query():
     """Test workflow with general queries"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TEST 3: General Queries → RAG Node")
-    print(f"{'='*70}")
-    
     workflow = ChatbotWorkflow()
     
     test_queries = [
@@ -324,13 +674,18 @@ def test_workflow_general_query():
         "What payment methods do you accept?"
     ]
     
-    for i, query in enumerate(test_queries, 1):
+    # All queries in flight at once; printed after they complete
+    results = await asyncio.gather(*(workflow.arun(query) for query in test_queries))
+    
+    print(f"\n{'='*70}")
+    print(f"🧪 TEST 3: General Queries → RAG Node")
+    print(f"{'='*70}")
+    
+    for i, (query, result) in enumerate(zip(test_queries, results), 1):
         print(f"\n{'-'*70}")
         print(f"General Query {i}/{len(test_queries)}")
         print(f"{'-'*70}")
         
-        result = workflow.run(query, verbose=False)
-        
         print(f"Query: {query}")
         print(f"Category: {result['classified_category']}")
         print(f"Route: general → RAG")
@@ -347,12 +702,8 @@ def test_workflow_general_query():
     print(f"{'='*70}")
 
 
-def test_complete_workflow():
+async def test_complete_workflow():
     """Test complete workflow with diverse queries"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TEST 4: Complete Workflow - Mixed Queries")
-    print(f"{'='*70}")
-    
     workflow = ChatbotWorkflow()
     
     # Mixed test cases
@@ -381,13 +732,17 @@ def test_complete_workflow():
     
     success_count = 0
     
-    for i, test in enumerate(test_cases, 1):
+    results = await asyncio.gather(*(workflow.arun(test['query']) for test in test_cases))
+    
+    print(f"\n{'='*70}")
+    print(f"🧪 TEST 4: Complete Workflow - Mixed Queries")
+    print(f"{'='*70}")
+    
+    for i, (test, result) in enumerate(zip(test_cases, results), 1):
         print(f"\n{'-'*70}")
         print(f"Mixed Query {i}/{len(test_cases)}")
         print(f"{'-'*70}")
         
-        result = workflow.run(test['query'], verbose=False)
-        
         print(f"Query: {test['query']}")
         print(f"Expected Category: {test['expected_category']}")
         print(f"Actual Category: {result['classified_category']}")
@@ -416,12 +771,8 @@ def test_complete_workflow():
     print(f"\n✅ Complete workflow functioning correctly!")
 
 
-def test_workflow_routing_accuracy():
+async def test_workflow_routing_accuracy():
     """Test routing accuracy with edge cases"""
-    print(f"\n{'='*70}")
-    print(f"🧪 TEST 5: Routing Accuracy - Edge Cases")
-    print(f"{'='*70}")
-    
     workflow = ChatbotWorkflow()
     
     # Edge case queries
@@ -436,9 +787,13 @@ def test_workflow_routing_accuracy():
     
     correct_routes = 0
     
-    for query, expected_category, expected_route in test_cases:
-        result = workflow.run(query, verbose=False)
-        
+    results = await asyncio.gather(*(workflow.arun(query) for query, _, _ in test_cases))
+    
+    print(f"\n{'='*70}")
+    print(f"🧪 TEST 5: Routing Accuracy - Edge Cases")
+    print(f"{'='*70}")
+    
+    for (query, expected_category, expected_route), result in zip(test_cases, results):
         actual_route = "escalation" if result.get('needs_escalation', False) else "rag"
         
         print(f"\nQuery: '{query}'")
@@ -471,21 +826,18 @@ if __name__ == "__main__":
     print(f"#  LANGGRAPH WORKFLOW - COMPREHENSIVE TESTING")
     print(f"{'#'*70}")
     
+    async def run_all_tests():
+        # All five suites run concurrently; each prints once its queries finish
+        await asyncio.gather(
+            test_workflow_product_query(),     # Test 1: Product queries
+            test_workflow_returns_query(),     # Test 2: Returns queries
+            test_workflow_general_query(),     # Test 3: General queries
+            test_complete_workflow(),          # Test 4: Complete workflow
+            test_workflow_routing_accuracy(),  # Test 5: Routing accuracy
+        )
+    
     try:
-        # Test 1: Product queries
-        test_workflow_product_query()
-        
-        # Test 2: Returns queries
-        test_workflow_returns_query()
-        
-        # Test 3: General queries
-        test_workflow_general_query()
-        
-        # Test 4: Complete workflow
-        test_complete_workflow()
-        
-        # Test 5: Routing accuracy
-        test_workflow_routing_accuracy()
+        asyncio.run(run_all_tests())
         
         print(f"\n{'='*70}")
         print(f"✅ ALL WORKFLOW TESTS PASSED!")
@@ -14,6 +14,7 @@ from .auth import (
 
 from .rate_limit import (
     RateLimiter,
+    RedisRateLimiter,
     RateLimitMiddleware,
     create_rate_limiter,
 )
@@ -32,6 +33,7 @@ __all__ = [
     
     # Rate Limiting
     "RateLimiter",
+    "RedisRateLimiter",
     "RateLimitMiddleware",
     "create_rate_limiter",
 ]
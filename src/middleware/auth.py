@@ -3,15 +3,23 @@ Authentication and Security Middleware for TechGear Electronics Chatbot API
 Provides API key authentication, JWT tokens, and request validation
 """
 
+import base64
+import calendar
+import hashlib
+import hmac
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List
-from functools import wraps
+from typing import Optional, List, Tuple
+from functools import lru_cache, wraps
 
 from fastapi import HTTPException, Security, Depends, status
 from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
+import orjson
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
@@ -23,19 +31,67 @@ from pydantic import BaseModel
 # API Key configuration
 API_KEY_NAME = "X-API-Key"
 API_KEY_AUTH_ENABLED = os.getenv("API_KEY_AUTH_ENABLED", "false").lower() == "true"
-VALID_API_KEYS = set(os.getenv("API_KEYS", "").split(",")) if os.getenv("API_KEYS") else set()
+
+
+def _hash_api_key(api_key: str) -> bytes:
+    """16-byte BLAKE2b digest of an API key"""
+    return hashlib.blake2b(api_key.encode(), digest_size=16).digest()
+
+
+# Only digests of the configured keys are kept; lookups hash the presented key
+_HASHED_API_KEYS = frozenset(
+    _hash_api_key(key) for key in os.getenv("API_KEYS", "").split(",") if key
+)
 
 # JWT configuration
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", secrets.token_urlsafe(64))
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRY_MINUTES = int(os.getenv("JWT_EXPIRY_MINUTES", "60"))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+
+# Key bytes and algorithm list prepared once for every encode/decode
+_JWT_KEY = JWT_SECRET_KEY.encode()
+_JWT_ALGORITHMS = [JWT_ALGORITHM]
+
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used by JWT"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# HMAC algorithms are signed directly: the header segment is fixed and the
+# keyed HMAC state is set up once and copied per token
+_JWT_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+if JWT_ALGORITHM in _JWT_HMAC_DIGESTS:
+    _JWT_HEADER_B64 = _b64url(orjson.dumps({"alg": JWT_ALGORITHM, "typ": "JWT"}))
+    _JWT_SIGNER = hmac.new(_JWT_KEY, digestmod=_JWT_HMAC_DIGESTS[JWT_ALGORITHM])
+else:
+    _JWT_SIGNER = None
 
 # Security schemes
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 bearer_scheme = HTTPBearer(auto_error=False)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - new hashes are argon2id; bcrypt hashes still verify and
+# are flagged for rehashing (see verify_and_update_password)
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+# Recent verify_password results, keyed by (keyed password digest, hash)
+PASSWORD_VERIFY_CACHE_SIZE = int(os.getenv("PASSWORD_VERIFY_CACHE_SIZE", "1024"))
+_verify_cache: "OrderedDict[Tuple[bytes, str], bool]" = OrderedDict()
+_verify_cache_lock = threading.Lock()
+# Per-process HMAC key, so digests in the cache cannot be brute-forced offline
+_verify_cache_key = secrets.token_bytes(32)
 
 
 # =============================================================================
@@ -92,7 +148,7 @@ async def verify_api_key(api_key: Optional[str] = Security(api_key_header)) -> b
             headers={"WWW-Authenticate": "ApiKey"},
         )
     
-    if api_key not in VALID_API_KEYS:
+    if _hash_api_key(api_key) not in _HASHED_API_KEYS:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -125,15 +181,78 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRY_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     
-    return encoded_jwt
+    if _JWT_SIGNER is None:
+        return jwt.encode(to_encode, _JWT_KEY, algorithm=JWT_ALGORITHM)
+    
+    # Registered time claims are NumericDate (seconds since the epoch, UTC)
+    for claim in ("exp", "iat", "nbf"):
+        if isinstance(to_encode.get(claim), datetime):
+            to_encode[claim] = calendar.timegm(to_encode[claim].utctimetuple())
+    
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url(orjson.dumps(to_encode))
+    signer = _JWT_SIGNER.copy()
+    signer.update(signing_input)
+    encoded_jwt = signing_input + b"." + _b64url(signer.digest())
+    
+    return encoded_jwt.decode()
+
+
+def _invalid_token(reason: str) -> HTTPException:
+    """401 response for a token that failed verification"""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=f"Invalid token: {reason}",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+@lru_cache(maxsize=JWT_CACHE_SIZE)
+def _decode_token(token: str) -> Tuple[TokenData, float]:
+    """
+    Verify a token's signature and claims (cached per token string)
+    
+    A token's bytes fix its claims, so a verified token stays valid until
+    its ``exp`` - the caller checks expiry on every use. Failures raise and
+    are not cached.
+    
+    Args:
+        token: JWT token string
+        
+    Returns:
+        Tuple of (token data, expiry as a Unix timestamp)
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            _JWT_KEY,
+            algorithms=_JWT_ALGORITHMS,
+            options={"require": ["exp"]}
+        )
+    except jwt.InvalidTokenError as e:
+        raise _invalid_token(str(e))
+    
+    username: str = payload.get("sub")
+    email: str = payload.get("email")
+    scopes: list = payload.get("scopes", [])
+    
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return TokenData(username=username, email=email, scopes=scopes), float(payload["exp"])
 
 
 def verify_token(token: str) -> TokenData:
     """
     Verify and decode JWT token
     
+    The returned TokenData is shared between calls with the same token and
+    must not be modified.
+    
     Args:
         token: JWT token string
         
@@ -143,27 +262,15 @@ def verify_token(token: str) -> TokenData:
     Raises:
         HTTPException: If token is invalid
     """
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        username: str = payload.get("sub")
-        email: str = payload.get("email")
-        scopes: list = payload.get("scopes", [])
-        
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return TokenData(username=username, email=email, scopes=scopes)
-        
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid token: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Anything that is not header.payload.signature fails before any crypto
+    if token.count(".") != 2:
+        raise _invalid_token("Not enough segments")
+    
+    token_data, expires_at = _decode_token(token)
+    if expires_at <= time.time():
+        raise _invalid_token("Signature has expired")
+    
+    return token_data
 
 
 async def get_current_user(
@@ -199,6 +306,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash
     
+    Results are cached for repeated checks of the same credentials. The
+    plaintext is never stored - the cache key is an HMAC-SHA256 of it under
+    a random per-process key, together with the hash (whose embedded salt
+    already makes it unique per user).
+    
     Args:
         plain_password: Plain text password
         hashed_password: Hashed password
@@ -206,7 +318,45 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if password matches
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    key = (
+        hmac.new(_verify_cache_key, plain_password.encode(), hashlib.sha256).digest(),
+        hashed_password,
+    )
+    with _verify_cache_lock:
+        result = _verify_cache.get(key)
+        if result is not None:
+            _verify_cache.move_to_end(key)
+            return result
+    
+    result = pwd_context.verify(plain_password, hashed_password)
+    
+    with _verify_cache_lock:
+        _verify_cache[key] = result
+        while len(_verify_cache) > PASSWORD_VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return result
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash is outdated
+    
+    Legacy bcrypt hashes (and argon2 hashes made with older parameters)
+    verify as usual and come back with a fresh argon2id hash, which the
+    caller should store in place of the old one.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Stored hash
+        
+    Returns:
+        Tuple of (password matches, replacement hash or None)
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
 
 
 def get_password_hash(password: str) -> str:
@@ -1,15 +1,150 @@
 """Rate limiting middleware for TechGear Electronics Chatbot API"""
 
+import threading
 import time
-from typing import Dict, Tuple
-from collections import defaultdict
-from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import logging
 import os
 
+import numpy as np
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
+try:
+    import redis
+except ImportError:  # redis is optional - create_rate_limiter falls back to in-memory
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Never rate limited: probes, metrics scrapes and API docs
+_EXEMPT_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json", "/metrics"})
+
+_NS_PER_SECOND = 1_000_000_000
+_MINUTE_NS = 60 * _NS_PER_SECOND
+_HOUR_NS = 3600 * _NS_PER_SECOND
+_CLEANUP_INTERVAL_NS = 300 * _NS_PER_SECOND
+
+# Number of independently locked identifier shards (power of two)
+_SHARD_COUNT = 16
+
+
+# Fixed-window check-and-count, atomic on the Redis server.
+# KEYS: minute counter, hour counter; ARGV: minute limit, hour limit.
+# Returns {allowed, minute count, hour count, retry after (seconds)}.
+# Like the in-memory limiter, rejected requests are not counted.
+_RATE_LIMIT_LUA = """
+local minute = tonumber(redis.call('GET', KEYS[1]) or '0')
+local hour = tonumber(redis.call('GET', KEYS[2]) or '0')
+if minute >= tonumber(ARGV[1]) then
+    return {0, minute, hour, redis.call('TTL', KEYS[1])}
+end
+if hour >= tonumber(ARGV[2]) then
+    return {0, minute, hour, redis.call('TTL', KEYS[2])}
+end
+minute = redis.call('INCR', KEYS[1])
+if minute == 1 then redis.call('EXPIRE', KEYS[1], 60) end
+hour = redis.call('INCR', KEYS[2])
+if hour == 1 then redis.call('EXPIRE', KEYS[2], 3600) end
+return {1, minute, hour, 0}
+"""
+
+
+class ClientBucket:
+    """
+    Request timestamps of one client, as a ring buffer of int64 nanoseconds
+
+    Timestamps are appended in order, so the live entries (``count`` of them
+    from ``head``, wrapping at the end of ``buf``) are sorted and window
+    counts are a binary search. The buffer starts small and doubles up to
+    ``capacity``; once full, appending overwrites the oldest entry.
+    """
+
+    __slots__ = ("buf", "capacity", "head", "count")
+
+    def __init__(self, capacity: int, initial_size: int = 16):
+        """
+        Initialize ClientBucket
+
+        Args:
+            capacity: Maximum number of timestamps kept
+            initial_size: Initial buffer length
+        """
+        self.capacity = max(1, capacity)
+        self.buf = np.empty(min(self.capacity, initial_size), dtype=np.int64)
+        self.head = 0
+        self.count = 0
+
+    def _segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Live entries as (older, newer) views; newer is empty unless wrapped"""
+        end = self.head + self.count
+        if end <= len(self.buf):
+            return self.buf[self.head:end], self.buf[:0]
+        return self.buf[self.head:], self.buf[:end - len(self.buf)]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        """Timestamp at a logical position (0 = oldest)"""
+        return int(self.buf[(self.head + index) % len(self.buf)])
+
+    def append(self, ts: int):
+        """Record a timestamp (not older than the newest one)"""
+        size = len(self.buf)
+        if self.count == size:
+            if size < self.capacity:
+                older, newer = self._segments()
+                self.buf = np.concatenate(
+                    [older, newer, np.empty(min(self.capacity, size * 2) - size, dtype=np.int64)]
+                )
+                self.head = 0
+                size = len(self.buf)
+            else:
+                self.head = (self.head + 1) % size
+                self.count -= 1
+        self.buf[(self.head + self.count) % size] = ts
+        self.count += 1
+
+    def count_after(self, cutoff: int) -> int:
+        """Number of timestamps newer than cutoff"""
+        older, newer = self._segments()
+        idx = int(older.searchsorted(cutoff, side="right"))
+        if idx < len(older):
+            return self.count - idx
+        return len(newer) - int(newer.searchsorted(cutoff, side="right"))
+
+    def expire(self, cutoff: int):
+        """Drop timestamps at or before cutoff"""
+        stale = self.count - self.count_after(cutoff)
+        if stale:
+            self.head = (self.head + stale) % len(self.buf)
+            self.count -= stale
+
+    def window(self, expire_cutoff: int, count_cutoff: int) -> Tuple[int, int]:
+        """
+        Expire and count in one pass (the rate limiter's per-request call)
+
+        Args:
+            expire_cutoff: Drop timestamps at or before this
+            count_cutoff: Also count timestamps newer than this
+
+        Returns:
+            Tuple of (remaining count, count newer than count_cutoff)
+        """
+        end = self.head + self.count
+        if end > len(self.buf):
+            self.expire(expire_cutoff)
+            return self.count, self.count_after(count_cutoff)
+        # Unwrapped - a single searchsorted covers both cutoffs
+        live = self.count
+        stale, older = self.buf[self.head:end].searchsorted((expire_cutoff, count_cutoff), side="right").tolist()
+        if stale:
+            self.head += stale
+            self.count -= stale
+        return self.count, live - max(stale, older)
+
 
 class RateLimiter:
     """
@@ -32,44 +167,46 @@ class RateLimiter:
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
         
-        # Storage for request counts
-        self.minute_requests: Dict[str, list] = defaultdict(list)
-        self.hour_requests: Dict[str, list] = defaultdict(list)
+        # Request timestamps per identifier over the last hour; the minute
+        # window is the tail of the same bucket. Identifiers are spread over
+        # _SHARD_COUNT dicts, each with its own lock, so concurrent requests
+        # from different clients rarely wait on each other
+        self._shards: List[Dict[str, ClientBucket]] = [{} for _ in range(_SHARD_COUNT)]
+        self._locks = [threading.Lock() for _ in range(_SHARD_COUNT)]
         
-        # Last cleanup time
-        self.last_cleanup = datetime.now()
+        # Next idle-bucket sweep (time.time_ns)
+        self._next_cleanup = time.time_ns() + _CLEANUP_INTERVAL_NS
     
-    def _cleanup_old_requests(self):
+    def _usage(self, minute_count: int, hour_count: int) -> Dict[str, int]:
+        """Usage stats dict for the given window counts"""
+        return {
+            "requests_last_minute": minute_count,
+            "requests_last_hour": hour_count,
+            "limit_per_minute": self.requests_per_minute,
+            "limit_per_hour": self.requests_per_hour,
+            "remaining_minute": max(0, self.requests_per_minute - minute_count),
+            "remaining_hour": max(0, self.requests_per_hour - hour_count),
+        }
+    
+    @staticmethod
+    def _shard(identifier: str) -> int:
+        """Shard index of an identifier"""
+        return hash(identifier) & (_SHARD_COUNT - 1)
+    
+    def _cleanup_old_requests(self, now: int):
         """Remove old request timestamps to prevent memory growth"""
-        now = datetime.now()
-        
-        # Cleanup every 5 minutes
-        if (now - self.last_cleanup).total_seconds() < 300:
-            return
-        
-        one_hour_ago = now - timedelta(hours=1)
-        
-        # Clean minute requests
-        for key in list(self.minute_requests.keys()):
-            self.minute_requests[key] = [
-                ts for ts in self.minute_requests[key]
-                if ts > one_hour_ago.timestamp()
-            ]
-            if not self.minute_requests[key]:
-                del self.minute_requests[key]
-        
-        # Clean hour requests
-        for key in list(self.hour_requests.keys()):
-            self.hour_requests[key] = [
-                ts for ts in self.hour_requests[key]
-                if ts > one_hour_ago.timestamp()
-            ]
-            if not self.hour_requests[key]:
-                del self.hour_requests[key]
+        self._next_cleanup = now + _CLEANUP_INTERVAL_NS
+        one_hour_ago = now - _HOUR_NS
         
-        self.last_cleanup = now
+        # Idle identifiers keep stale windows until swept here
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                for key in list(shard.keys()):
+                    shard[key].expire(one_hour_ago)
+                    if not shard[key]:
+                        del shard[key]
     
-    def is_allowed(self, identifier: str) -> Tuple[bool, str]:
+    def is_allowed(self, identifier: str) -> Tuple[bool, str, Dict[str, int]]:
         """
         Check if request is allowed
         
@@ -77,40 +214,128 @@ class RateLimiter:
             identifier: Unique identifier (e.g., IP address)
             
         Returns:
-            Tuple of (is_allowed, reason)
+            Tuple of (is_allowed, reason, usage stats as from ``get_usage``,
+            counting this request when it is allowed)
         """
-        now = time.time()
-        one_minute_ago = now - 60
-        one_hour_ago = now - 3600
+        now = time.time_ns()
         
-        # Cleanup old requests periodically
-        self._cleanup_old_requests()
+        # Cleanup old requests every 5 minutes
+        if now >= self._next_cleanup:
+            self._cleanup_old_requests(now)
         
-        # Get recent requests
-        recent_minute = [
-            ts for ts in self.minute_requests[identifier]
-            if ts > one_minute_ago
-        ]
-        recent_hour = [
-            ts for ts in self.hour_requests[identifier]
-            if ts > one_hour_ago
-        ]
+        index = self._shard(identifier)
+        shard = self._shards[index]
+        with self._locks[index]:
+            # Slide the hour window forward; what remains are the recent requests
+            recent_hour = shard.get(identifier)
+            if recent_hour is None:
+                # Rejected requests are not recorded, so the hour limit bounds the window
+                recent_hour = shard[identifier] = ClientBucket(self.requests_per_hour)
+            hour_count, minute_count = recent_hour.window(now - _HOUR_NS, now - _MINUTE_NS)
+            
+            # Check per-minute limit
+            if minute_count >= self.requests_per_minute:
+                minute_oldest = recent_hour[hour_count - minute_count]
+                retry_after = int(60 - (now - minute_oldest) / _NS_PER_SECOND)
+                return False, f"Rate limit exceeded: {self.requests_per_minute} requests per minute. Retry after {retry_after} seconds.", self._usage(minute_count, hour_count)
+            
+            # Check per-hour limit
+            if hour_count >= self.requests_per_hour:
+                retry_after = int(3600 - (now - recent_hour[0]) / _NS_PER_SECOND)
+                return False, f"Rate limit exceeded: {self.requests_per_hour} requests per hour. Retry after {retry_after} seconds.", self._usage(minute_count, hour_count)
+            
+            # Record this request
+            recent_hour.append(now)
         
-        # Check per-minute limit
-        if len(recent_minute) >= self.requests_per_minute:
-            retry_after = int(60 - (now - min(recent_minute)))
-            return False, f"Rate limit exceeded: {self.requests_per_minute} requests per minute. Retry after {retry_after} seconds."
+        return True, "", self._usage(minute_count + 1, hour_count + 1)
+    
+    def get_usage(self, identifier: str) -> Dict[str, int]:
+        """
+        Get current usage stats for an identifier
         
-        # Check per-hour limit
-        if len(recent_hour) >= self.requests_per_hour:
-            retry_after = int(3600 - (now - min(recent_hour)))
-            return False, f"Rate limit exceeded: {self.requests_per_hour} requests per hour. Retry after {retry_after} seconds."
+        Args:
+            identifier: Unique identifier
+            
+        Returns:
+            Dict with usage stats
+        """
+        index = self._shard(identifier)
+        now = time.time_ns()
+        with self._locks[index]:
+            bucket = self._shards[index].get(identifier)
+            if bucket is None:
+                return self._usage(0, 0)
+            hour_count, minute_count = bucket.window(now - _HOUR_NS, now - _MINUTE_NS)
+        return self._usage(minute_count, hour_count)
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Rate limiter with counters shared through Redis
+    
+    The in-memory limiter is per process, so N workers allow N times the
+    configured rate. Here every worker and host counts against the same
+    fixed-window keys (``ratelimit:<id>:m:<epoch minute>`` and
+    ``ratelimit:<id>:h:<epoch hour>``), updated by one Lua script call per
+    request. Key TTLs handle expiry. If Redis errors, the inherited
+    in-memory windows take over for that request.
+    """
+    
+    def __init__(
+        self,
+        client,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        key_prefix: str = "ratelimit"
+    ):
+        """
+        Initialize Redis rate limiter
+        
+        Args:
+            client: ``redis.Redis`` client
+            requests_per_minute: Maximum requests per minute
+            requests_per_hour: Maximum requests per hour
+            key_prefix: Prefix for the counter keys
+        """
+        super().__init__(requests_per_minute, requests_per_hour)
+        self.client = client
+        self.key_prefix = key_prefix
+        self._script = client.register_script(_RATE_LIMIT_LUA)
+    
+    def _keys(self, identifier: str, now: float) -> Tuple[str, str]:
+        """Counter keys for the current minute and hour windows"""
+        epoch = int(now)
+        return (
+            f"{self.key_prefix}:{identifier}:m:{epoch // 60}",
+            f"{self.key_prefix}:{identifier}:h:{epoch // 3600}",
+        )
+    
+    def is_allowed(self, identifier: str) -> Tuple[bool, str, Dict[str, int]]:
+        """
+        Check if request is allowed
         
-        # Record this request
-        self.minute_requests[identifier].append(now)
-        self.hour_requests[identifier].append(now)
+        Args:
+            identifier: Unique identifier (e.g., IP address)
+            
+        Returns:
+            Tuple of (is_allowed, reason, usage stats as from ``get_usage``,
+            counting this request when it is allowed)
+        """
+        try:
+            allowed, minute_count, hour_count, retry_after = self._script(
+                keys=self._keys(identifier, time.time()),
+                args=[self.requests_per_minute, self.requests_per_hour]
+            )
+        except redis.RedisError as e:
+            logger.warning("Redis rate limit check failed, using in-memory limits: %s", e)
+            return super().is_allowed(identifier)
         
-        return True, ""
+        usage = self._usage(minute_count, hour_count)
+        if allowed:
+            return True, "", usage
+        if minute_count >= self.requests_per_minute:
+            return False, f"Rate limit exceeded: {self.requests_per_minute} requests per minute. Retry after {retry_after} seconds.", usage
+        return False, f"Rate limit exceeded: {self.requests_per_hour} requests per hour. Retry after {retry_after} seconds.", usage
     
     def get_usage(self, identifier: str) -> Dict[str, int]:
         """
@@ -122,27 +347,15 @@ class RateLimiter:
         Returns:
             Dict with usage stats
         """
-        now = time.time()
-        one_minute_ago = now - 60
-        one_hour_ago = now - 3600
-        
-        minute_count = len([
-            ts for ts in self.minute_requests[identifier]
-            if ts > one_minute_ago
-        ])
-        hour_count = len([
-            ts for ts in self.hour_requests[identifier]
-            if ts > one_hour_ago
-        ])
+        try:
+            minute_count, hour_count = (
+                int(count or 0) for count in self.client.mget(self._keys(identifier, time.time()))
+            )
+        except redis.RedisError as e:
+            logger.warning("Redis rate limit usage lookup failed, using in-memory counts: %s", e)
+            return super().get_usage(identifier)
         
-        return {
-            "requests_last_minute": minute_count,
-            "requests_last_hour": hour_count,
-            "limit_per_minute": self.requests_per_minute,
-            "limit_per_hour": self.requests_per_hour,
-            "remaining_minute": max(0, self.requests_per_minute - minute_count),
-            "remaining_hour": max(0, self.requests_per_hour - hour_count),
-        }
+        return self._usage(minute_count, hour_count)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -161,6 +374,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.rate_limiter = rate_limiter
         self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        self._exempt = _EXEMPT_PATHS
     
     async def dispatch(self, request: Request, call_next) -> Response:
         """
@@ -173,23 +387,24 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         Returns:
             Response
         """
-        # Skip rate limiting if disabled
-        if not self.enabled:
+        # Exempt paths first - /health is the highest-QPS endpoint (probes)
+        if request.url.path in self._exempt:
             return await call_next(request)
         
-        # Skip rate limiting for health check and docs
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
+        # Skip rate limiting if disabled
+        if not self.enabled:
             return await call_next(request)
         
         # Get client identifier (IP address)
-        # In production with reverse proxy, use X-Forwarded-For
-        client_ip = request.client.host
+        # In production with reverse proxy, use X-Forwarded-For (first hop only)
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
-            client_ip = forwarded_for.split(",")[0].strip()
+            client_ip = forwarded_for.partition(",")[0].strip()
+        else:
+            client_ip = request.client.host
         
         # Check rate limit
-        allowed, reason = self.rate_limiter.is_allowed(client_ip)
+        allowed, reason, usage = self.rate_limiter.is_allowed(client_ip)
         
         if not allowed:
             raise HTTPException(
@@ -201,9 +416,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 }
             )
         
-        # Add rate limit headers to response
+        # Add rate limit headers to response (usage as of the check above)
         response = await call_next(request)
-        usage = self.rate_limiter.get_usage(client_ip)
         
         response.headers["X-RateLimit-Limit-Minute"] = str(usage["limit_per_minute"])
         response.headers["X-RateLimit-Limit-Hour"] = str(usage["limit_per_hour"])
@@ -221,12 +435,36 @@ def create_rate_limiter() -> RateLimiter:
     """
     Create rate limiter from environment configuration
     
+    ``RATE_LIMIT_BACKEND=redis`` shares the counters across workers through
+    ``REDIS_URL``; when redis is not installed or the server cannot be
+    reached, the in-memory limiter is used instead.
+    
     Returns:
         RateLimiter instance
     """
     requests_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     requests_per_hour = int(os.getenv("RATE_LIMIT_PER_HOUR", "1000"))
     
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+        if redis is None:
+            logger.warning("RATE_LIMIT_BACKEND=redis but redis is not installed; using in-memory rate limits")
+        else:
+            try:
+                client = redis.Redis.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379"),
+                    password=os.getenv("REDIS_PASSWORD") or None,
+                    db=int(os.getenv("REDIS_DB", "0")),
+                    socket_timeout=0.25
+                )
+                client.ping()
+                return RedisRateLimiter(
+                    client,
+                    requests_per_minute=requests_per_minute,
+                    requests_per_hour=requests_per_hour
+                )
+            except redis.RedisError as e:
+                logger.warning("Redis unavailable (%s); using in-memory rate limits", e)
+    
     return RateLimiter(
         requests_per_minute=requests_per_minute,
         requests_per_hour=requests_per_hour
@@ -243,9 +481,8 @@ if __name__ == "__main__":
     
     # Simulate requests
     for i in range(7):
-        allowed, reason = limiter.is_allowed("192.168.1.1")
+        allowed, reason, usage = limiter.is_allowed("192.168.1.1")
         print(f"Request {i+1}: {'Allowed' if allowed else 'Blocked'} - {reason}")
         
         if allowed:
-            usage = limiter.get_usage("192.168.1.1")
             print(f"  Usage: {usage}")
@@ -0,0 +1,149 @@
+"""
+Quantized Index Service
+In-memory int8 copy of the ChromaDB collection for fast similarity search
+"""
+
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+try:
+    import faiss
+except ImportError:  # faiss is optional - fall back to a NumPy int8 scan
+    faiss = None
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-vector int8 quantization
+
+    Each row is scaled so its largest absolute component maps to 127:
+    ``q = round(v * 127 / max|v|)`` and ``v ~= q * scale``.
+
+    Args:
+        vectors: Float array of shape (n, dim)
+
+    Returns:
+        Tuple of (int8 codes of shape (n, dim), float32 scales of shape (n,))
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    peak = np.abs(vectors).max(axis=1)
+    scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.round(vectors / scales[:, None]), -128, 127).astype(np.int8)
+    return codes, scales
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row of a float32 array (zero rows are left as is)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class Int8VectorIndex:
+    """
+    Cosine-similarity index over int8-quantized embeddings
+
+    Backends:
+        - ``faiss``: ``IndexScalarQuantizer`` with 8-bit codes (SIMD kernels)
+        - ``numpy``: int8 codes scored with an int32 matrix product
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        """
+        Build the index
+
+        Args:
+            vectors: Float embeddings of shape (n, dim)
+        """
+        vectors = normalize_rows(vectors)
+        self.size, self.dim = vectors.shape
+
+        if faiss is not None:
+            self.backend = "faiss"
+            self._index = faiss.IndexScalarQuantizer(
+                self.dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            self._index.train(vectors)
+            self._index.add(vectors)
+        else:
+            self.backend = "numpy"
+            codes, scales = quantize_int8(vectors)
+            self._codes = codes.astype(np.int32)
+            self._scales = scales
+
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Find the k most similar rows
+
+        Args:
+            vector: Query embedding of shape (dim,)
+            k: Number of results
+
+        Returns:
+            List of (row, cosine similarity) pairs, best first
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return []
+
+        query = normalize_rows(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+        if self.backend == "faiss":
+            scores, rows = self._index.search(query, k)
+            return [(int(row), float(score)) for row, score in zip(rows[0], scores[0]) if row >= 0]
+
+        codes, scale = quantize_int8(query)
+        sims = (self._codes @ codes[0].astype(np.int32)) * (self._scales * scale[0])
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(int(row), float(sims[row])) for row in top]
+
+
+class Int8Retriever(BaseRetriever):
+    """
+    Retriever that searches an int8 index built from a Chroma collection
+
+    Query embedding still uses the collection's embedding function; only the
+    stored document vectors are quantized.
+    """
+
+    index: Any
+    documents: List[Document]
+    embed_query: Callable[[str], List[float]]
+    k: int = 3
+
+    @classmethod
+    def from_vector_store(cls, vector_store, k: int = 3) -> "Int8Retriever":
+        """
+        Build a retriever from a LangChain Chroma vector store
+
+        Args:
+            vector_store: Loaded Chroma vector store
+            k: Number of documents to retrieve
+
+        Returns:
+            Int8Retriever instance
+        """
+        data = vector_store.get(include=["embeddings", "documents", "metadatas"])
+        if data["embeddings"] is None or len(data["embeddings"]) == 0:
+            raise ValueError("collection has no stored embeddings")
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {})
+            for text, metadata in zip(data["documents"], data["metadatas"])
+        ]
+        return cls(
+            index=Int8VectorIndex(np.asarray(data["embeddings"], dtype=np.float32)),
+            documents=documents,
+            embed_query=vector_store.embeddings.embed_query,
+            k=k
+        )
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        hits = self.index.search(np.asarray(self.embed_query(query), dtype=np.float32), self.k)
+        return [self.documents[row] for row, _ in hits]
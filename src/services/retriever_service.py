@@ -3,17 +3,38 @@ Retriever Service - RAG Pipeline Component
 Creates and manages retrievers for similarity-based document retrieval
 """
 
+import hashlib
 import os
-from typing import List, Optional
+import sys
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from dotenv import load_dotenv
 
-from vector_store import VectorStoreService
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vector_store import VectorStoreService
 
 # Load environment variables
 load_dotenv()
 
+# Search an in-memory int8-quantized copy of the collection instead of
+# Chroma's FP32 index (similarity search only; Chroma remains the fallback)
+RETRIEVER_INT8 = os.getenv("RETRIEVER_INT8", "false").lower() == "true"
+
+# Query embeddings memoized in process; with a cache directory set they are
+# also kept on disk (one .npy per query) and survive restarts. Meant for
+# test and benchmark runs over fixed query sets - new files stop being
+# written once the directory holds EMBEDDING_CACHE_MAX_FILES of them
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "")
+EMBEDDING_CACHE_MAX_FILES = int(os.getenv("EMBEDDING_CACHE_MAX_FILES", "10000"))
+
 
 class RetrieverService:
     """
@@ -26,7 +47,8 @@ class RetrieverService:
         persist_directory: str = "./chroma_db",
         collection_name: str = "techgear_knowledge",
         search_type: str = "similarity",
-        k: int = 3
+        k: int = 3,
+        use_int8: Optional[bool] = None
     ):
         """
         Initialize RetrieverService
@@ -36,11 +58,13 @@ class RetrieverService:
             collection_name: Name of the collection to retrieve from
             search_type: Type of search ("similarity" or "mmr")
             k: Number of documents to retrieve (default: 3)
+            use_int8: Use the int8-quantized index (defaults to RETRIEVER_INT8)
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
         self.search_type = search_type
         self.k = k
+        self.use_int8 = RETRIEVER_INT8 if use_int8 is None else use_int8
         
         # Initialize vector store service
         self.vector_store_service = VectorStoreService(
@@ -52,11 +76,20 @@ class RetrieverService:
         self.vector_store = None
         self.retriever = None
         
+        # Bumped on every (re)load so caches of retrieval results can tell
+        # when the knowledge base may have changed
+        self.kb_version = 0
+        
+        self._embed_cached = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._compute_embedding)
+        # Files in the on-disk embedding cache (counted on first write)
+        self._embedding_files: Optional[int] = None
+        
         print(f"✅ RetrieverService initialized")
         print(f"   Persist Directory: {self.persist_directory}")
         print(f"   Collection Name: {self.collection_name}")
         print(f"   Search Type: {self.search_type}")
         print(f"   Top K Results: {self.k}")
+        print(f"   Int8 Index: {'enabled' if self.use_int8 else 'disabled'}")
     
     def load_retriever(self) -> Optional[BaseRetriever]:
         """
@@ -81,10 +114,17 @@ class RetrieverService:
         print(f"   Search Type: {self.search_type}")
         print(f"   Top K: {self.k}")
         
-        self.retriever = self.vector_store.as_retriever(
-            search_type=self.search_type,
-            search_kwargs={"k": self.k}
-        )
+        self.retriever = None
+        if self.use_int8 and self.search_type == "similarity":
+            self.retriever = self.load_int8_retriever()
+        
+        if self.retriever is None:
+            self.retriever = self.vector_store.as_retriever(
+                search_type=self.search_type,
+                search_kwargs={"k": self.k}
+            )
+        
+        self.kb_version += 1
         
         print(f"✅ Retriever created successfully!")
         print(f"   Type: {type(self.retriever).__name__}")
@@ -92,6 +132,118 @@ class RetrieverService:
         
         return self.retriever
     
+    def load_int8_retriever(self) -> Optional[BaseRetriever]:
+        """
+        Build a retriever over an int8-quantized copy of the collection
+        
+        Returns:
+            Int8Retriever instance, or None to fall back to Chroma
+        """
+        from services.quantized_index import Int8Retriever
+        
+        try:
+            retriever = Int8Retriever.from_vector_store(self.vector_store, k=self.k)
+        except Exception as e:
+            print(f"⚠️  Int8 index unavailable, using Chroma search: {e}")
+            return None
+        
+        print(f"✅ Int8 index built ({retriever.index.size} vectors, {retriever.index.backend})")
+        return retriever
+    
+    def _embedding_path(self, query: str) -> str:
+        """On-disk cache file for a query embedding"""
+        embeddings = self.vector_store_service.embeddings_function
+        model = getattr(embeddings, "model", None) or type(embeddings).__name__
+        digest = hashlib.sha256(f"{model}\0{query}".encode()).hexdigest()
+        return os.path.join(EMBEDDING_CACHE_DIR, f"{digest}.npy")
+    
+    def _persist_embedding(self, path: str, vector: np.ndarray):
+        """Write a query embedding to the on-disk cache, unless it is full"""
+        try:
+            if self._embedding_files is None:
+                os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+                self._embedding_files = sum(
+                    1 for entry in os.scandir(EMBEDDING_CACHE_DIR) if entry.name.endswith(".npy")
+                )
+            if self._embedding_files >= EMBEDDING_CACHE_MAX_FILES:
+                return
+            # Write then rename, so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+            os.replace(tmp_path, path)
+            self._embedding_files += 1
+        except OSError as e:
+            print(f"⚠️  Could not persist query embedding: {e}")
+    
+    def _compute_embedding(self, query: str) -> np.ndarray:
+        """Embed a query, going through the on-disk cache when configured"""
+        path = self._embedding_path(query) if EMBEDDING_CACHE_DIR else None
+        
+        vector = None
+        if path and os.path.exists(path):
+            try:
+                vector = np.load(path)
+            except (OSError, ValueError):
+                vector = None
+        
+        if vector is None:
+            vector = np.asarray(
+                self.vector_store_service.embeddings_function.embed_query(query),
+                dtype=np.float32
+            )
+            if path:
+                self._persist_embedding(path, vector)
+        
+        # Shared by every caller that hits the LRU - must not be modified
+        vector.setflags(write=False)
+        return vector
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed a query with the collection's embedding model
+        
+        Results are memoized (``EMBEDDING_CACHE_SIZE`` entries, plus up to
+        ``EMBEDDING_CACHE_MAX_FILES`` in ``EMBEDDING_CACHE_DIR`` when set).
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Read-only float32 query embedding
+        """
+        return self._embed_cached(query)
+    
+    def retrieve_by_vector(self, embedding: Sequence[float]) -> List[Document]:
+        """
+        Retrieve documents for an already computed query embedding
+        
+        Uses the same index and search type as the retriever, without
+        embedding the query again.
+        
+        Args:
+            embedding: Query embedding from ``embed_query``
+            
+        Returns:
+            List of relevant Document objects
+        """
+        if self.retriever is None:
+            self.load_retriever()
+        
+        if self.retriever is None:
+            return []
+        
+        # Int8Retriever: search its in-memory index directly
+        index = getattr(self.retriever, "index", None)
+        if index is not None:
+            hits = index.search(np.asarray(embedding, dtype=np.float32), self.k)
+            return [self.retriever.documents[row] for row, _ in hits]
+        
+        embedding = [float(x) for x in embedding]
+        if self.search_type == "mmr":
+            return self.vector_store.max_marginal_relevance_search_by_vector(embedding, k=self.k)
+        return self.vector_store.similarity_search_by_vector(embedding, k=self.k)
+    
     def retrieve(self, query: str) -> List[Document]:
         """
         Retrieve relevant documents for a query
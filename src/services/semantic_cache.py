@@ -0,0 +1,285 @@
+"""
+Semantic Cache Service
+Caches responses keyed by query embedding similarity
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # faiss is optional - fall back to a NumPy inner-product scan
+    faiss = None
+
+
+class SemanticCache:
+    """
+    Response cache keyed by query embedding similarity
+
+    Queries are embedded, L2-normalized and compared by inner product
+    (cosine similarity). A lookup hits when the closest cached query
+    scores at or above the threshold ``tau``. Inserting a near-duplicate
+    of a cached query (similarity >= tau) replaces that entry's value
+    instead of adding a second one; eviction is least recently used.
+
+    Backends:
+        - ``lsh``: random-projection LSH buckets (when ``lsh_bits`` is set);
+          only entries sharing the query's sign-bit signature are scored
+        - ``faiss``: exact ``IndexFlatIP`` search (when faiss is installed)
+        - ``numpy``: exact inner-product scan over all cached vectors
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], List[float]],
+        dim: Optional[int] = None,
+        tau: float = 0.92,
+        max_size: int = 1000,
+        ttl_seconds: Optional[float] = None,
+        lsh_bits: Optional[int] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize SemanticCache
+
+        Args:
+            embed_fn: Function mapping a query string to its embedding
+            dim: Embedding dimension (inferred from the first vector if None)
+            tau: Minimum cosine similarity for a cache hit (0.0-1.0)
+            max_size: Maximum number of cached entries (least recently used
+                evicted first)
+            ttl_seconds: Entry lifetime in seconds (None = never expire)
+            lsh_bits: Number of random hyperplanes for LSH bucketing
+                (None = exact search)
+            seed: Random seed for the LSH hyperplanes
+        """
+        self.embed_fn = embed_fn
+        self.dim = dim
+        self.tau = tau
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.lsh_bits = lsh_bits
+        self.seed = seed
+
+        if lsh_bits:
+            self.backend = "lsh"
+        elif faiss is not None:
+            self.backend = "faiss"
+        else:
+            self.backend = "numpy"
+
+        # id -> (vector, value, inserted_at, lsh_signature), least recently used first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._index = None
+        self._vectors = None
+        self._row_ids: List[int] = []
+        self._planes = None
+        self._buckets: Dict[bytes, List[int]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(embedding) -> np.ndarray:
+        """
+        L2-normalize a raw embedding into the cache's vector layout
+
+        Args:
+            embedding: Query embedding (any float sequence)
+
+        Returns:
+            Normalized float32 vector of shape (1, dim)
+        """
+        vector = np.array(embedding, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embed and L2-normalize a query
+
+        Args:
+            query: Query text
+
+        Returns:
+            Normalized float32 vector of shape (1, dim)
+        """
+        return self.normalize(self.embed_fn(query))
+
+    def _ensure_index(self, dim: int):
+        """Create the backing index on first use"""
+        if self.dim is None:
+            self.dim = dim
+        if self.backend == "faiss" and self._index is None:
+            self._index = faiss.IndexIDMap(faiss.IndexFlatIP(self.dim))
+        elif self.backend == "numpy" and self._vectors is None:
+            self._vectors = np.empty((0, self.dim), dtype=np.float32)
+        elif self.backend == "lsh" and self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.dim, self.lsh_bits)).astype(np.float32)
+
+    def _signature(self, vector: np.ndarray) -> bytes:
+        """Sign-bit signature of a vector against the LSH hyperplanes"""
+        return np.packbits((vector[0] @ self._planes) > 0).tobytes()
+
+    def _nearest(self, vector: np.ndarray):
+        """Return (entry_id, score) of the closest candidate, or (None, 0.0)"""
+        if self.backend == "faiss":
+            scores, ids = self._index.search(vector, 1)
+            entry_id = int(ids[0][0])
+            return (entry_id, float(scores[0][0])) if entry_id >= 0 else (None, 0.0)
+
+        if self.backend == "numpy":
+            sims = self._vectors @ vector[0]
+            row = int(np.argmax(sims))
+            return self._row_ids[row], float(sims[row])
+
+        candidates = self._buckets.get(self._signature(vector))
+        if not candidates:
+            return None, 0.0
+        matrix = np.vstack([self._entries[entry_id][0] for entry_id in candidates])
+        sims = matrix @ vector[0]
+        best = int(np.argmax(sims))
+        return candidates[best], float(sims[best])
+
+    def _remove(self, entry_id: int):
+        """Drop an entry from the index and the entry table"""
+        _, _, _, signature = self._entries.pop(entry_id)
+        if self.backend == "faiss":
+            self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+        elif self.backend == "numpy":
+            row = self._row_ids.index(entry_id)
+            self._row_ids.pop(row)
+            self._vectors = np.delete(self._vectors, row, axis=0)
+        else:
+            bucket = self._buckets[signature]
+            bucket.remove(entry_id)
+            if not bucket:
+                del self._buckets[signature]
+
+    def lookup_vector(self, vector: np.ndarray) -> Optional[Any]:
+        """
+        Find the cached value for the nearest query embedding
+
+        Args:
+            vector: Normalized query embedding from ``embed``
+
+        Returns:
+            Cached value if similarity >= tau and not expired, otherwise None
+        """
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            entry_id, score = self._nearest(vector)
+            if entry_id is None or score < self.tau:
+                self.misses += 1
+                return None
+
+            _, value, inserted_at, _ = self._entries[entry_id]
+            if self.ttl_seconds is not None and time.monotonic() - inserted_at > self.ttl_seconds:
+                self._remove(entry_id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return value
+
+    def insert_vector(self, vector: np.ndarray, value: Any):
+        """
+        Cache a value under a query embedding
+
+        Args:
+            vector: Normalized query embedding from ``embed``
+            value: Value to cache
+        """
+        with self._lock:
+            self._ensure_index(vector.shape[1])
+
+            if self._entries:
+                # Near-duplicate of a cached query - refresh it in place
+                entry_id, score = self._nearest(vector)
+                if entry_id is not None and score >= self.tau:
+                    cached_vector, _, _, signature = self._entries[entry_id]
+                    self._entries[entry_id] = (cached_vector, value, time.monotonic(), signature)
+                    self._entries.move_to_end(entry_id)
+                    return
+
+            while self._entries and len(self._entries) >= self.max_size:
+                # Evict the least recently used entry
+                self._remove(next(iter(self._entries)))
+
+            entry_id = self._next_id
+            self._next_id += 1
+
+            signature = None
+            if self.backend == "faiss":
+                self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            elif self.backend == "numpy":
+                self._vectors = np.vstack([self._vectors, vector])
+                self._row_ids.append(entry_id)
+            else:
+                signature = self._signature(vector)
+                self._buckets.setdefault(signature, []).append(entry_id)
+
+            self._entries[entry_id] = (vector[0], value, time.monotonic(), signature)
+
+    def lookup(self, query: str) -> Optional[Any]:
+        """
+        Look up a cached value for a query
+
+        Args:
+            query: Query text
+
+        Returns:
+            Cached value for a semantically similar query, or None
+        """
+        return self.lookup_vector(self.embed(query))
+
+    def insert(self, query: str, value: Any):
+        """
+        Cache a value for a query
+
+        Args:
+            query: Query text
+            value: Value to cache
+        """
+        self.insert_vector(self.embed(query), value)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._row_ids = []
+            if self._index is not None:
+                self._index.reset()
+            if self._vectors is not None:
+                self._vectors = self._vectors[:0]
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with size, hits, misses and threshold
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "tau": self.tau,
+            "ttl_seconds": self.ttl_seconds,
+            "backend": self.backend,
+        }
@@ -2,7 +2,13 @@
 Test loading persisted vector store without re-embedding
 """
 
-from vector_store import VectorStoreService
+import os
+import sys
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.vector_store import VectorStoreService
 
 print("\n" + "="*70)
 print("  TESTING PERSISTENT VECTOR STORE LOADING")
@@ -2,7 +2,13 @@
 Test retriever quality and relevance
 """
 
-from retriever_service import RetrieverService
+import os
+import sys
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.retriever_service import RetrieverService
 
 print("\n" + "="*70)
 print("  RETRIEVER QUALITY TESTING")
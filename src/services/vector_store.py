@@ -4,12 +4,17 @@ Store and retrieve embeddings using ChromaDB persistent storage
 """
 
 import os
+import sys
 from typing import List, Optional
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 from dotenv import load_dotenv
 
-from embeddings_service import EmbeddingsService
+if __package__ in (None, ""):
+    # Executed as a script - put src/ on the path for package imports
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embeddings_service import EmbeddingsService
 
 # Load environment variables
 load_dotenv()
@@ -128,7 +133,7 @@ def store_knowledge_base_embeddings():
     
     # Step 1: Load the knowledge base
     print(f"\n📚 Step 1: Loading knowledge base...")
-    from knowledge_loader import load_knowledge_base
+    from services.knowledge_loader import load_knowledge_base
     
     # Get absolute path to knowledge base
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -143,7 +148,7 @@ def store_knowledge_base_embeddings():
     
     # Step 2: Chunk the documents
     print(f"\n✂️  Step 2: Chunking documents...")
-    from text_chunker import TextChunker
+    from services.text_chunker import TextChunker
     
     chunker = TextChunker()
     chunks = chunker.chunk_documents(documents)
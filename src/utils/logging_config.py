@@ -7,11 +7,12 @@ import logging
 import logging.handlers
 import os
 import sys
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
+import orjson
+
 
 # =============================================================================
 # Configuration
@@ -63,7 +64,7 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
         
-        return json.dumps(log_data)
+        return orjson.dumps(log_data).decode()
 
 
 class ColoredFormatter(logging.Formatter):
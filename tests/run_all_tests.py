@@ -19,6 +19,8 @@ sys.path.insert(0, str(project_root))
 # Import test modules
 from test_knowledge_base import run_knowledge_base_tests
 from test_graph_components import run_graph_component_tests
+from test_caches import run_cache_tests
+from test_middleware import run_middleware_tests
 from test_end_to_end import run_end_to_end_tests
 
 
@@ -85,6 +87,8 @@ def print_footer(total_time, all_results):
     suite_names = [
         "Knowledge Base & Embeddings",
         "LangGraph Components",
+        "Caches & Vector Index",
+        "Middleware",
         "End-to-End Integration"
     ]
     
@@ -179,20 +183,30 @@ def run_all_tests():
     
     try:
         # Test 1: Knowledge Base & Embeddings
-        print("\n📚 Phase 1/3: Testing Knowledge Base & Embeddings...")
+        print("\n📚 Phase 1/5: Testing Knowledge Base & Embeddings...")
         result1 = run_knowledge_base_tests()
         all_results.append(result1)
         
         # Test 2: Graph Components
-        print("\n🔄 Phase 2/3: Testing LangGraph Components...")
+        print("\n🔄 Phase 2/5: Testing LangGraph Components...")
         result2 = run_graph_component_tests()
         all_results.append(result2)
         
-        # Test 3: End-to-End Integration
-        print("\n🚀 Phase 3/3: Testing End-to-End Integration...")
-        result3 = run_end_to_end_tests()
+        # Test 3: Caches
+        print("\n🗄️  Phase 3/5: Testing Caches & Vector Index...")
+        result3 = run_cache_tests()
         all_results.append(result3)
         
+        # Test 4: Middleware
+        print("\n🔐 Phase 4/5: Testing Middleware...")
+        result4 = run_middleware_tests()
+        all_results.append(result4)
+        
+        # Test 5: End-to-End Integration
+        print("\n🚀 Phase 5/5: Testing End-to-End Integration...")
+        result5 = run_end_to_end_tests()
+        all_results.append(result5)
+        
     except KeyboardInterrupt:
         print("\n\n⚠️  Tests interrupted by user!")
         return
@@ -249,6 +263,8 @@ def save_test_report(all_results, total_time):
             suite_names = [
                 "Knowledge Base & Embeddings",
                 "LangGraph Components",
+                "Caches & Vector Index",
+                "Middleware",
                 "End-to-End Integration"
             ]
             
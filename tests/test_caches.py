@@ -0,0 +1,296 @@
+"""
+Test Caches
+===========
+
+Tests for:
+- Semantic Cache
+- Response Cache
+- Int8 Vector Index
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import unittest
+
+import numpy as np
+
+from graph.response_cache import ResponseCache, apply_cached
+from graph.state import create_initial_state
+from services.quantized_index import Int8VectorIndex, quantize_int8
+from services.semantic_cache import SemanticCache
+
+
+def near_duplicate(vector: np.ndarray, cosine: float, rng: np.random.Generator) -> np.ndarray:
+    """Unit vector at the given cosine similarity to a unit vector"""
+    noise = rng.standard_normal(vector.shape[0])
+    noise -= (noise @ vector) * vector
+    noise /= np.linalg.norm(noise)
+    return cosine * vector + np.sqrt(1 - cosine ** 2) * noise
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test embedding-similarity response cache"""
+    
+    def setUp(self):
+        """Create a random unit vector and a near-duplicate of it"""
+        self.rng = np.random.default_rng(0)
+        vector = self.rng.standard_normal(768)
+        self.vector = vector / np.linalg.norm(vector)
+        self.paraphrase = near_duplicate(self.vector, 0.97, self.rng)
+    
+    def _cache(self, **kwargs) -> SemanticCache:
+        return SemanticCache(embed_fn=None, tau=0.95, **kwargs)
+    
+    def test_near_duplicate_above_tau_hits(self):
+        """Test that a lookup above tau returns the cached value"""
+        cache = self._cache()
+        cache.insert_vector(cache.normalize(self.vector), "answer")
+        
+        self.assertEqual(cache.lookup_vector(cache.normalize(self.paraphrase)), "answer")
+        print("✅ Near-duplicate above tau served from cache")
+    
+    def test_below_tau_misses(self):
+        """Test that a lookup below tau is a miss"""
+        cache = self._cache()
+        cache.insert_vector(cache.normalize(self.vector), "answer")
+        
+        other = near_duplicate(self.vector, 0.80, self.rng)
+        self.assertIsNone(cache.lookup_vector(cache.normalize(other)))
+        self.assertEqual(cache.stats()["misses"], 1)
+        print("✅ Dissimilar query missed")
+    
+    def test_near_duplicate_insert_replaces_entry(self):
+        """Test that inserting a near-duplicate refreshes the entry in place"""
+        cache = self._cache()
+        cache.insert_vector(cache.normalize(self.vector), "old")
+        cache.insert_vector(cache.normalize(self.paraphrase), "new")
+        
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.lookup_vector(cache.normalize(self.vector)), "new")
+        print("✅ Near-duplicate insert replaced the entry")
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = self._cache(max_size=2)
+        vectors = [cache.normalize(v) for v in np.eye(3, 768)]
+        cache.insert_vector(vectors[0], "a")
+        cache.insert_vector(vectors[1], "b")
+        cache.lookup_vector(vectors[0])
+        cache.insert_vector(vectors[2], "c")
+        
+        self.assertEqual(cache.lookup_vector(vectors[0]), "a")
+        self.assertIsNone(cache.lookup_vector(vectors[1]))
+        print("✅ Least recently used entry evicted")
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are not served"""
+        cache = self._cache(ttl_seconds=0.01)
+        cache.insert_vector(cache.normalize(self.vector), "answer")
+        time.sleep(0.02)
+        
+        self.assertIsNone(cache.lookup_vector(cache.normalize(self.vector)))
+        self.assertEqual(cache.stats()["size"], 0)
+        print("✅ Expired entry dropped")
+
+
+def finished_state(query: str, **metadata) -> dict:
+    """Final workflow state of a RAG answer to query"""
+    return {
+        **create_initial_state(query),
+        'classified_category': 'product',
+        'final_response': f"answer to {query}",
+        'retrieved_documents': [],
+        'needs_escalation': False,
+        'metadata': {'rag_used': True, 'document_count': 0, 'response_source': 'rag', **metadata},
+    }
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test two-tier workflow response cache"""
+    
+    def setUp(self):
+        """Map two phrasings of one question to near-duplicate embeddings"""
+        rng = np.random.default_rng(1)
+        vector = rng.standard_normal(768)
+        vector /= np.linalg.norm(vector)
+        self.embeddings = {
+            "what is the price of the smartwatch?": vector,
+            "how much does the smartwatch cost?": near_duplicate(vector, 0.97, rng),
+            "what is your warranty?": near_duplicate(vector, 0.50, rng),
+        }
+    
+    def _embed(self, query: str):
+        return self.embeddings[" ".join(query.lower().split())]
+    
+    def test_exact_hit_ignores_case_and_whitespace(self):
+        """Test that trivial variants of a query share the exact entry"""
+        cache = ResponseCache(max_size=10)
+        cache.put("What is the price?", finished_state("What is the price?"))
+        
+        cached = cache.get("  what IS the   price? ")
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached['final_response'], "answer to What is the price?")
+        print("✅ Exact tier served a normalized variant")
+    
+    def test_only_answer_fields_and_metadata_cached(self):
+        """Test that the entry holds the answer fields and answering-node metadata"""
+        cache = ResponseCache(max_size=10)
+        cache.put("q", finished_state("q", classification_method='keyword', document_count=2))
+        
+        cached = cache.get("q")
+        self.assertEqual(
+            set(cached), {'final_response', 'retrieved_documents', 'needs_escalation', 'metadata'}
+        )
+        self.assertEqual(
+            cached['metadata'], {'rag_used': True, 'document_count': 2, 'response_source': 'rag'}
+        )
+        print("✅ Cached entry limited to answer fields and RAG metadata")
+    
+    def test_failed_runs_not_cached(self):
+        """Test that errored or empty results are never stored"""
+        cache = ResponseCache(max_size=10)
+        cache.put("errored", finished_state("errored", error="LLM timeout"))
+        empty = finished_state("empty")
+        empty['final_response'] = ""
+        cache.put("empty", empty)
+        
+        self.assertIsNone(cache.get("errored"))
+        self.assertIsNone(cache.get("empty"))
+        self.assertEqual(cache.stats()["exact_size"], 0)
+        print("✅ Failed runs not cached")
+    
+    def test_ttl_expiry(self):
+        """Test that expired exact entries are dropped"""
+        cache = ResponseCache(max_size=10, ttl_seconds=0.01)
+        cache.put("q", finished_state("q"))
+        time.sleep(0.02)
+        
+        self.assertIsNone(cache.get("q"))
+        self.assertEqual(cache.stats()["exact_size"], 0)
+        print("✅ Expired exact entry dropped")
+    
+    def test_semantic_hit_for_paraphrase(self):
+        """Test that a paraphrase is served by the semantic tier and promoted"""
+        cache = ResponseCache(max_size=10, embed_fn=self._embed)
+        query = "What is the price of the SmartWatch?"
+        cache.put(query, finished_state(query))
+        
+        paraphrase = "How much does the SmartWatch cost?"
+        state = create_initial_state(paraphrase)
+        cached = cache.get(paraphrase, state)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached['final_response'], f"answer to {query}")
+        # The embedding is left on the state and the hit promoted to the exact tier
+        self.assertIsNotNone(state['query_embedding'])
+        self.assertEqual(cache.stats()["exact_size"], 2)
+        
+        self.assertIsNone(cache.get("What is your warranty?"))
+        print("✅ Paraphrase served from semantic tier")
+    
+    def test_apply_cached_keeps_fresh_classification(self):
+        """Test that a hit answers the state without overwriting its classification"""
+        cache = ResponseCache(max_size=10)
+        cache.put("q", finished_state("q"))
+        
+        state = create_initial_state("q")
+        state['classified_category'] = 'general'
+        state['metadata'] = {'classification_method': 'keyword'}
+        state = apply_cached(state, cache.get("q"))
+        
+        self.assertEqual(state['classified_category'], 'general')
+        self.assertEqual(state['final_response'], "answer to q")
+        self.assertEqual(state['metadata']['classification_method'], 'keyword')
+        self.assertTrue(state['metadata']['cache_hit'])
+        self.assertTrue(state['metadata']['rag_used'])
+        print("✅ Cached answer applied, classification kept")
+
+
+class TestInt8VectorIndex(unittest.TestCase):
+    """Test int8-quantized cosine similarity index"""
+    
+    def setUp(self):
+        """Build an index over random embeddings"""
+        self.rng = np.random.default_rng(2)
+        self.vectors = self.rng.standard_normal((200, 128)).astype(np.float32)
+        self.index = Int8VectorIndex(self.vectors)
+    
+    def test_quantize_int8_error_bound(self):
+        """Test that each component is reconstructed within half a step"""
+        codes, scales = quantize_int8(self.vectors)
+        
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(int(np.abs(codes).max()), 127)
+        error = np.abs(codes * scales[:, None] - self.vectors)
+        self.assertTrue(np.all(error <= scales[:, None] / 2 + 1e-6))
+        print("✅ int8 quantization within half a step")
+    
+    def test_stored_vector_is_nearest(self):
+        """Test that a stored vector finds itself first"""
+        for row in (0, 57, 199):
+            (best, score), = self.index.search(self.vectors[row], k=1)
+            self.assertEqual(best, row)
+            self.assertAlmostEqual(score, 1.0, delta=0.01)
+        print("✅ Stored vectors found at rank 1")
+    
+    def test_matches_float_ranking(self):
+        """Test that the top hit of a noisy query matches float cosine search"""
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        for row in range(0, 200, 20):
+            query = near_duplicate(normalized[row], 0.9, self.rng)
+            results = self.index.search(query, k=5)
+            
+            self.assertEqual(results[0][0], int(np.argmax(normalized @ query)))
+            scores = [score for _, score in results]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+        print("✅ Top hits match float cosine ranking")
+    
+    def test_k_bounds(self):
+        """Test that k is clamped to the index size"""
+        self.assertEqual(len(self.index.search(self.vectors[0], k=500)), 200)
+        self.assertEqual(self.index.search(self.vectors[0], k=0), [])
+        print("✅ k clamped to index size")
+
+
+def run_cache_tests():
+    """Run all cache tests"""
+    print("\n" + "="*70)
+    print("TESTING CACHES")
+    print("="*70 + "\n")
+    
+    # Create test suite
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    
+    # Add test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestSemanticCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestResponseCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestInt8VectorIndex))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    # Print summary
+    print("\n" + "="*70)
+    print("CACHE TESTS SUMMARY")
+    print("="*70)
+    print(f"Tests Run: {result.testsRun}")
+    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors) - len(result.skipped)}")
+    print(f"Failures: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print(f"Skipped: {len(result.skipped)}")
+    print("="*70 + "\n")
+    
+    return result
+
+
+if __name__ == "__main__":
+    run_cache_tests()
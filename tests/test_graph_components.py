@@ -7,6 +7,8 @@ Tests for:
 - RAG Node
 - Escalation Node
 - Workflow Routing
+- Batched Workflow Runs
+- State Helpers
 """
 
 import os
@@ -20,8 +22,21 @@ sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "src"))
 
 import unittest
-from graph.state import ChatbotState
-from graph.classifier_node import QueryClassifier
+from unittest import mock
+
+import numpy as np
+
+from graph.state import (
+    ChatbotState,
+    DocRef,
+    dequantize_embedding,
+    quantize_embedding,
+    store_chunk,
+    update_state,
+    update_state_inplace,
+)
+from graph.response_cache import ResponseCache
+from graph.classifier_node import CATEGORY_KEYWORDS, QueryClassifier
 from graph.rag_node import RAGResponseNode
 from graph.escalation_node import EscalationHandler
 from graph.workflow import ChatbotWorkflow, get_workflow
@@ -166,6 +181,14 @@ class TestClassifierNode(unittest.TestCase):
         self.assertLessEqual(result["confidence_score"], 1.0)
         
         print(f"✅ Confidence score within valid range: {result['confidence_score']}")
+        
+    def test_keyword_patterns_are_lowercase(self):
+        """Test that keyword patterns are lowercase (queries are lowercased, matching is case-sensitive)"""
+        for category, patterns in CATEGORY_KEYWORDS.items():
+            for pattern in patterns:
+                self.assertEqual(pattern, pattern.lower(), f"{category} pattern not lowercase: {pattern}")
+        
+        print(f"✅ All keyword patterns are lowercase")
 
 
 class TestRAGNode(unittest.TestCase):
@@ -323,6 +346,137 @@ class TestWorkflow(unittest.TestCase):
             self.skipTest(f"Skipping - initialization issue: {e}")
 
 
+def _fake_classify(state):
+    """Route refund questions to escalation and everything else to RAG"""
+    route = "escalation" if "refund" in state['user_query'].lower() else "rag"
+    return update_state(state, classified_category="product", _next_node=route)
+
+
+def _fake_escalate(state):
+    return update_state(state, final_response="escalated", needs_escalation=True)
+
+
+class TestWorkflowBatch(unittest.TestCase):
+    """Test batched workflow runs (nodes mocked, no LLM calls)"""
+    
+    def setUp(self):
+        """Workflow with an exact-only response cache and mocked nodes"""
+        self.workflow = ChatbotWorkflow.__new__(ChatbotWorkflow)
+        self.workflow.response_cache = ResponseCache(max_size=10)
+        self.rag_calls = []
+        
+        def fake_rag_batch(states):
+            self.rag_calls.append([state['user_query'] for state in states])
+            return [
+                update_state(
+                    state,
+                    final_response=f"answer to {state['user_query']}",
+                    retrieved_documents=[],
+                    metadata_patch={'rag_used': True}
+                )
+                for state in states
+            ]
+        
+        for name, fake in (
+            ("classifier_node", _fake_classify),
+            ("escalation_node", _fake_escalate),
+            ("rag_response_node_batch", fake_rag_batch),
+        ):
+            patcher = mock.patch(f"graph.workflow.{name}", side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def test_duplicates_run_once(self):
+        """Test that duplicate queries share one run but keep their own IDs"""
+        queries = ["What is the price?", "I want a refund", "what is  the PRICE?", "Battery life?"]
+        results = self.workflow.run_batch(queries)
+        
+        self.assertEqual(self.rag_calls, [["What is the price?", "Battery life?"]])
+        self.assertEqual([r['final_response'] for r in results], [
+            "answer to What is the price?",
+            "escalated",
+            "answer to What is the price?",
+            "answer to Battery life?",
+        ])
+        self.assertEqual(results[2]['user_query'], "what is  the PRICE?")
+        self.assertNotEqual(results[0]['conversation_id'], results[2]['conversation_id'])
+        print("✅ Duplicate queries run once")
+    
+    def test_repeat_batch_served_from_cache(self):
+        """Test that RAG answers from an earlier batch are cache hits"""
+        self.workflow.run_batch(["What is the price?"])
+        results = self.workflow.run_batch(["What is the price?", "Battery life?"])
+        
+        self.assertEqual(self.rag_calls, [["What is the price?"], ["Battery life?"]])
+        self.assertTrue(results[0]['metadata']['cache_hit'])
+        self.assertTrue(results[0]['metadata']['rag_used'])
+        print("✅ Repeated query served from response cache")
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns no results"""
+        self.assertEqual(self.workflow.run_batch([]), [])
+        print("✅ Empty batch handled")
+
+
+class TestStateHelpers(unittest.TestCase):
+    """Test chunk store, embedding packing and state update helpers"""
+    
+    def test_store_chunk_deduplicates(self):
+        """Test that the same chunk text and source map to one id"""
+        first = store_chunk("Return window is 30 days.", {"source": "kb.txt"})
+        again = store_chunk("Return window is 30 days.", {"source": "kb.txt"})
+        other = store_chunk("Return window is 30 days.", {"source": "faq.txt"})
+        
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+        print("✅ Chunk store deduplicates chunks")
+    
+    def test_doc_ref_resolves_chunk(self):
+        """Test that DocRef reads text and metadata from the chunk store"""
+        chunk_id = store_chunk("SmartWatch Pro X costs $299.", {"source": "kb.txt"})
+        ref = DocRef(rank=1, chunk_id=chunk_id)
+        
+        self.assertEqual(ref.content, "SmartWatch Pro X costs $299.")
+        self.assertEqual(ref.metadata, {"source": "kb.txt"})
+        print("✅ DocRef resolves chunk content")
+    
+    def test_embedding_round_trip(self):
+        """Test that packed embeddings round-trip within int8 precision"""
+        embedding = np.random.default_rng(3).standard_normal(768).astype(np.float32)
+        data = quantize_embedding(embedding.tolist())
+        restored = dequantize_embedding(data)
+        
+        self.assertEqual(len(data), 4 + 768)
+        scale = np.abs(embedding).max() / 127
+        self.assertLessEqual(float(np.abs(restored - embedding).max()), scale / 2 + 1e-6)
+        # Re-packing a restored embedding is lossless
+        self.assertEqual(quantize_embedding(restored), data)
+        self.assertIsNone(dequantize_embedding(None))
+        print("✅ Embedding packing round-trips")
+    
+    def test_update_state_metadata_patch(self):
+        """Test that update_state merges metadata without mutating its input"""
+        state = ChatbotState(user_query="q", metadata={"classification_method": "keyword"})
+        updated = update_state(state, final_response="a", metadata_patch={"rag_used": True})
+        
+        self.assertEqual(updated['metadata'], {"classification_method": "keyword", "rag_used": True})
+        self.assertEqual(state['metadata'], {"classification_method": "keyword"})
+        self.assertNotIn('final_response', state)
+        print("✅ update_state merges metadata immutably")
+    
+    def test_update_state_inplace_metadata_patch(self):
+        """Test that update_state_inplace updates and returns the same state"""
+        patch = {"rag_used": True}
+        state = ChatbotState(user_query="q")
+        updated = update_state_inplace(state, final_response="a", metadata_patch=patch)
+        
+        self.assertIs(updated, state)
+        self.assertEqual(state['final_response'], "a")
+        self.assertEqual(state['metadata'], {"rag_used": True})
+        self.assertIsNot(state['metadata'], patch)
+        print("✅ update_state_inplace merges metadata in place")
+
+
 def run_graph_component_tests():
     """Run all graph component tests"""
     print("\n" + "="*70)
@@ -338,6 +492,8 @@ def run_graph_component_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestRAGNode))
     suite.addTests(loader.loadTestsFromTestCase(TestEscalationNode))
     suite.addTests(loader.loadTestsFromTestCase(TestWorkflow))
+    suite.addTests(loader.loadTestsFromTestCase(TestWorkflowBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestStateHelpers))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
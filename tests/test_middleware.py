@@ -0,0 +1,257 @@
+"""
+Test Middleware
+===============
+
+Tests for:
+- JWT Tokens
+- Rate Limiter Buckets
+- Rate Limiter
+"""
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+current_dir = Path(__file__).parent
+project_root = current_dir.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "src"))
+
+import unittest
+from unittest import mock
+
+import jwt
+import numpy as np
+from fastapi import HTTPException
+
+from middleware import auth, rate_limit
+from middleware.auth import create_access_token, verify_token
+from middleware.rate_limit import ClientBucket, RateLimiter
+
+_SECOND_NS = 1_000_000_000
+
+
+class TestJWT(unittest.TestCase):
+    """Test JWT creation and verification"""
+    
+    def setUp(self):
+        """Claims of a typical access token"""
+        self.claims = {"sub": "alice", "email": "alice@example.com", "scopes": ["chat"]}
+    
+    def test_fast_path_token_decodes_with_pyjwt(self):
+        """Test that directly signed tokens are standard JWTs"""
+        if auth._JWT_SIGNER is None:
+            self.skipTest(f"{auth.JWT_ALGORITHM} tokens are encoded by PyJWT")
+        token = create_access_token(self.claims)
+        
+        self.assertEqual(
+            jwt.get_unverified_header(token), {"alg": auth.JWT_ALGORITHM, "typ": "JWT"}
+        )
+        payload = jwt.decode(token, auth.JWT_SECRET_KEY, algorithms=[auth.JWT_ALGORITHM])
+        self.assertEqual({key: payload[key] for key in self.claims}, self.claims)
+        self.assertIsInstance(payload["exp"], int)
+        print("✅ Fast-path token decoded by PyJWT")
+    
+    def test_verify_token_round_trip(self):
+        """Test that verify_token returns the token's claims"""
+        token_data = verify_token(create_access_token(self.claims))
+        
+        self.assertEqual(token_data.username, "alice")
+        self.assertEqual(token_data.email, "alice@example.com")
+        self.assertEqual(token_data.scopes, ["chat"])
+        print("✅ Token verified")
+    
+    def test_invalid_tokens_rejected(self):
+        """Test that expired, tampered and malformed tokens are rejected"""
+        expired = create_access_token(self.claims, expires_delta=timedelta(seconds=-1))
+        token = create_access_token(self.claims)
+        signature = token.rsplit(".", 1)[1]
+        tampered = token[:-len(signature)] + signature[::-1]
+        
+        for bad in (expired, tampered, "not-a-token"):
+            with self.assertRaises(HTTPException) as ctx:
+                verify_token(bad)
+            self.assertEqual(ctx.exception.status_code, 401)
+        print("✅ Invalid tokens rejected")
+
+
+class TestClientBucket(unittest.TestCase):
+    """Test ring buffer of request timestamps"""
+    
+    def test_cutoffs_are_exclusive(self):
+        """Test that timestamps equal to a cutoff count as expired"""
+        bucket = ClientBucket(capacity=8)
+        for ts in (10, 20, 30):
+            bucket.append(ts)
+        
+        self.assertEqual(bucket.count_after(20), 1)
+        self.assertEqual(bucket.count_after(9), 3)
+        bucket.expire(20)
+        self.assertEqual([bucket[i] for i in range(len(bucket))], [30])
+        print("✅ Cutoffs exclusive")
+    
+    def test_growth_keeps_order(self):
+        """Test that the buffer grows up to capacity without reordering"""
+        bucket = ClientBucket(capacity=8, initial_size=2)
+        for ts in range(1, 6):
+            bucket.append(ts)
+        
+        self.assertEqual(len(bucket.buf), 8)
+        self.assertEqual([bucket[i] for i in range(len(bucket))], [1, 2, 3, 4, 5])
+        print("✅ Buffer grew in order")
+    
+    def test_full_buffer_overwrites_oldest(self):
+        """Test that appending to a full buffer wraps over the oldest entry"""
+        bucket = ClientBucket(capacity=4, initial_size=4)
+        for ts in range(1, 7):
+            bucket.append(ts)
+        
+        self.assertNotEqual(bucket.head, 0)
+        self.assertEqual([bucket[i] for i in range(len(bucket))], [3, 4, 5, 6])
+        self.assertEqual(bucket.count_after(4), 2)
+        self.assertEqual(bucket.window(3, 5), (3, 1))
+        print("✅ Full buffer wrapped")
+    
+    def test_window_matches_brute_force(self):
+        """Test window() against a list model on wrapped and unwrapped buffers"""
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            bucket = ClientBucket(capacity=8, initial_size=2)
+            model = []
+            ts = 0
+            for _ in range(int(rng.integers(1, 20))):
+                ts += int(rng.integers(0, 3))
+                bucket.append(ts)
+                model = (model + [ts])[-8:]
+                if rng.random() < 0.3:
+                    cutoff = ts - int(rng.integers(0, 5))
+                    bucket.expire(cutoff)
+                    model = [t for t in model if t > cutoff]
+            
+            expire_cutoff = ts - int(rng.integers(0, 10))
+            count_cutoff = ts - int(rng.integers(0, 10))
+            model = [t for t in model if t > expire_cutoff]
+            self.assertEqual(
+                bucket.window(expire_cutoff, count_cutoff),
+                (len(model), sum(t > count_cutoff for t in model))
+            )
+            self.assertEqual([bucket[i] for i in range(len(bucket))], model)
+        print("✅ window() matches brute force")
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test per-minute and per-hour rate limiting"""
+    
+    def setUp(self):
+        """Drive the limiter from a fake nanosecond clock"""
+        self.now = 1_700_000_000 * _SECOND_NS
+        patcher = mock.patch.object(rate_limit.time, "time_ns", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _advance(self, seconds: float):
+        self.now += round(seconds * _SECOND_NS)
+    
+    def test_is_allowed_contract(self):
+        """Test the (allowed, reason, usage) result, counting allowed requests only"""
+        limiter = RateLimiter(requests_per_minute=3, requests_per_hour=100)
+        
+        allowed, reason, usage = limiter.is_allowed("client")
+        self.assertTrue(allowed)
+        self.assertEqual(reason, "")
+        self.assertEqual(usage["requests_last_minute"], 1)
+        self.assertEqual(usage["remaining_minute"], 2)
+        self.assertEqual(usage, limiter.get_usage("client"))
+        
+        limiter.is_allowed("client")
+        limiter.is_allowed("client")
+        allowed, reason, usage = limiter.is_allowed("client")
+        self.assertFalse(allowed)
+        self.assertIn("3 requests per minute", reason)
+        self.assertEqual(usage["requests_last_minute"], 3)
+        self.assertEqual(usage["remaining_minute"], 0)
+        # The blocked request was not recorded
+        self.assertEqual(limiter.get_usage("client")["requests_last_hour"], 3)
+        print("✅ is_allowed returns (allowed, reason, usage)")
+    
+    def test_minute_window_edge(self):
+        """Test that a request leaves the minute window exactly 60s later"""
+        limiter = RateLimiter(requests_per_minute=1, requests_per_hour=100)
+        self.assertTrue(limiter.is_allowed("client")[0])
+        
+        self._advance(59.999)
+        self.assertFalse(limiter.is_allowed("client")[0])
+        self._advance(0.001)
+        self.assertTrue(limiter.is_allowed("client")[0])
+        print("✅ Minute window slides at 60s")
+    
+    def test_hour_limit(self):
+        """Test that the hour limit holds across minutes and then resets"""
+        limiter = RateLimiter(requests_per_minute=100, requests_per_hour=2)
+        limiter.is_allowed("client")
+        self._advance(120)
+        limiter.is_allowed("client")
+        self._advance(120)
+        
+        allowed, reason, _ = limiter.is_allowed("client")
+        self.assertFalse(allowed)
+        self.assertIn("2 requests per hour", reason)
+        self._advance(3600)
+        self.assertTrue(limiter.is_allowed("client")[0])
+        print("✅ Hour limit enforced")
+    
+    def test_identifiers_isolated(self):
+        """Test that limiting one client leaves others (same or other shard) alone"""
+        limiter = RateLimiter(requests_per_minute=2, requests_per_hour=100)
+        ips = [f"10.0.0.{i}" for i in range(64)]
+        blocked = ips[0]
+        same_shard = next(ip for ip in ips[1:] if limiter._shard(ip) == limiter._shard(blocked))
+        other_shard = next(ip for ip in ips[1:] if limiter._shard(ip) != limiter._shard(blocked))
+        
+        for _ in range(3):
+            limiter.is_allowed(blocked)
+        self.assertFalse(limiter.is_allowed(blocked)[0])
+        
+        for ip in (same_shard, other_shard):
+            allowed, _, usage = limiter.is_allowed(ip)
+            self.assertTrue(allowed)
+            self.assertEqual(usage["requests_last_minute"], 1)
+        print("✅ Clients limited independently")
+
+
+def run_middleware_tests():
+    """Run all middleware tests"""
+    print("\n" + "="*70)
+    print("TESTING MIDDLEWARE")
+    print("="*70 + "\n")
+    
+    # Create test suite
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    
+    # Add test classes
+    suite.addTests(loader.loadTestsFromTestCase(TestJWT))
+    suite.addTests(loader.loadTestsFromTestCase(TestClientBucket))
+    suite.addTests(loader.loadTestsFromTestCase(TestRateLimiter))
+    
+    # Run tests
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    # Print summary
+    print("\n" + "="*70)
+    print("MIDDLEWARE TESTS SUMMARY")
+    print("="*70)
+    print(f"Tests Run: {result.testsRun}")
+    print(f"Successes: {result.testsRun - len(result.failures) - len(result.errors) - len(result.skipped)}")
+    print(f"Failures: {len(result.failures)}")
+    print(f"Errors: {len(result.errors)}")
+    print(f"Skipped: {len(result.skipped)}")
+    print("="*70 + "\n")
+    
+    return result
+
+
+if __name__ == "__main__":
+    run_middleware_tests()